@@ -49,13 +49,18 @@ interface GameSignApi {
         @Query("checked_in") checkedIn: String? = null
     ): ApiResponse<List<Player>>
     
+    // 写操作带 Idempotency-Key：同一个键重发时服务器返回第一次的结果，不会重复执行
     @POST("api/v1/player/{id}/toggle_machine")
-    suspend fun toggleMachine(@Path("id") playerId: Int): ApiResponse<MachineStatus>
+    suspend fun toggleMachine(
+        @Path("id") playerId: Int,
+        @Header("Idempotency-Key") idempotencyKey: String? = null
+    ): ApiResponse<MachineStatus>
     
     @POST("api/v1/player/{id}/submit_score")
     suspend fun submitScore(
         @Path("id") playerId: Int,
-        @Body request: SubmitScoreRequest
+        @Body request: SubmitScoreRequest,
+        @Header("Idempotency-Key") idempotencyKey: String? = null
     ): ApiResponse<Any>
     
     // ============ 排行榜 ============
@@ -85,10 +90,11 @@ interface GameSignApi {
     @GET("api/v1/player/{id}/match")
     suspend fun getPlayerMatch(@Path("id") playerId: Int): ApiResponse<MatchInfo>
 
-    @POST("api/v1/player/{id}/peak/submit_song")
+    @POST("api/v1/player/{id}/match/submit_song")
     suspend fun submitPeakSong(
         @Path("id") playerId: Int,
-        @Body request: SubmitPeakSongRequest
+        @Body request: SubmitPeakSongRequest,
+        @Header("Idempotency-Key") idempotencyKey: String? = null
     ): ApiResponse<Any>
 
     @POST("api/v1/player/{id}/peak/ban_song")
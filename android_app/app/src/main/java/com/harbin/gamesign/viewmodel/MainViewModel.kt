@@ -19,6 +19,7 @@ import okhttp3.RequestBody.Companion.asRequestBody
 import okhttp3.RequestBody.Companion.toRequestBody
 import java.io.File
 import java.io.FileOutputStream
+import java.util.UUID
 
 sealed class UiState<out T> {
     object Loading : UiState<Nothing>()
@@ -30,6 +31,13 @@ class MainViewModel(application: Application) : AndroidViewModel(application) {
     
     private val prefs = UserPreferences(application)
     private val api = ApiClient.api
+
+    // 幂等键：请求没有得到服务器答复（网络错误）时保留，再点一次会带同一个键重发，
+    // 服务器直接返回第一次的结果，上机/下机不会被翻转两次，成绩和选曲不会重复提交
+    private val pendingKeys = mutableMapOf<Any, String>()
+
+    private fun idempotencyKey(request: Any): String =
+        pendingKeys.getOrPut(request) { UUID.randomUUID().toString() }
     
     // 登录状态
     val isLoggedIn: StateFlow<Boolean> = prefs.isLoggedIn
@@ -249,7 +257,9 @@ class MainViewModel(application: Application) : AndroidViewModel(application) {
         val playerId = savedPlayerId.value ?: return
         viewModelScope.launch {
             try {
-                val response = api.toggleMachine(playerId)
+                val request = Pair("toggle_machine", playerId)
+                val response = api.toggleMachine(playerId, idempotencyKey(request))
+                pendingKeys.remove(request)
                 if (response.success) {
                     _message.emit(response.message ?: "状态已更新")
                     refreshPlayer(playerId)
@@ -267,7 +277,9 @@ class MainViewModel(application: Application) : AndroidViewModel(application) {
         val playerId = savedPlayerId.value ?: return
         viewModelScope.launch {
             try {
-                val response = api.submitScore(playerId, SubmitScoreRequest(score = score, phase = phase))
+                val request = Pair(playerId, SubmitScoreRequest(score = score, phase = phase))
+                val response = api.submitScore(playerId, request.second, idempotencyKey(request))
+                pendingKeys.remove(request)
                 if (response.success) {
                     _message.emit(response.message ?: "成绩已提交")
                     refreshPlayer(playerId)
@@ -406,7 +418,9 @@ class MainViewModel(application: Application) : AndroidViewModel(application) {
         val playerId = savedPlayerId.value ?: return
         viewModelScope.launch {
             try {
-                val response = api.submitPeakSong(playerId, SubmitPeakSongRequest(song_name = songName, difficulty = difficulty))
+                val request = Pair(playerId, SubmitPeakSongRequest(song_name = songName, difficulty = difficulty))
+                val response = api.submitPeakSong(playerId, request.second, idempotencyKey(request))
+                pendingKeys.remove(request)
                 if (response.success) {
                     _message.emit("选曲提交成功")
                     loadMatchInfo(playerId)
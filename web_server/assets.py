@@ -0,0 +1,225 @@
+"""
+静态资源构建：压缩（minify）+ 内容哈希指纹 + 预压缩（.gz / .br）
+
+    flask --app app build-assets
+
+产物写入 static/dist/，文件名带内容哈希，可以放心设置一年期的 immutable 缓存；
+manifest.json 记录 "css/core.css" -> "css/core.<hash>.css" 的映射，模板通过 asset_url() 引用。
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+try:
+    import brotli  # 可选依赖
+except ImportError:
+    brotli = None
+
+
+# 需要处理的源文件（相对 static/）
+ASSET_FILES = [
+    'css/core.css',
+    'css/admin.css',
+    'css/index.css',
+    'js/effects.js',
+    'js/theme.js',
+]
+
+DIST_DIRNAME = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+
+# ================= CSS =================
+
+_CSS_TOKEN_RE = re.compile(
+    r'"(?:\\.|[^"\\])*"'        # 双引号字符串
+    r"|'(?:\\.|[^'\\])*'"       # 单引号字符串
+    r'|/\*.*?\*/'               # 注释
+    r'|\s+'                     # 空白
+    r'|[{};,:]'                 # 两侧空白可省略的符号
+    r'|[^"\'/\s{};,:]+|/',
+    re.S
+)
+# 这些符号两侧的空白可以安全去掉（不动 + - > ~，calc() 里的空格有语义）；
+# 冒号只去掉后面的空白，前面的空白在选择器里有语义（"a :hover" != "a:hover"）
+_CSS_TIGHT = set('{};,')
+
+
+def minify_css(source):
+    out = []
+    for tok in _CSS_TOKEN_RE.findall(source):
+        if tok.startswith('/*'):
+            continue
+        if tok.isspace():
+            if out and out[-1] != ' ' and out[-1] not in _CSS_TIGHT and out[-1] != ':':
+                out.append(' ')
+            continue
+        if tok in _CSS_TIGHT and out and out[-1] == ' ':
+            out.pop()
+        if tok == '}' and out and out[-1] == ';':
+            out.pop()
+        out.append(tok)
+    return ''.join(out).strip()
+
+
+# ================= JS =================
+
+# 这些字符之后出现的 / 是正则字面量的开始而不是除号
+_JS_REGEX_PREFIX = set('(,=:[!&|?{};+-*%<>~^') | {''}
+_JS_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of',
+                      'void', 'yield', 'delete', 'instanceof', 'new', 'throw'}
+_JS_TRAILING_WORD_RE = re.compile(r'([A-Za-z_$]+)\s*$')
+
+
+def _regex_allowed(out, last_sig):
+    if ''.join(out[-2:]) in ('++', '--'):   # i++ / 2
+        return False
+    if last_sig in _JS_REGEX_PREFIX:
+        return True
+    return _ends_with_keyword(out)
+
+
+def _ends_with_keyword(out):
+    m = _JS_TRAILING_WORD_RE.search(''.join(out[-12:]))
+    return bool(m) and m.group(1) in _JS_REGEX_KEYWORDS
+
+
+def minify_js(source):
+    """
+    保守的 JS 压缩：去掉注释、行首缩进和空行，保留换行（不依赖自动分号插入的变化）。
+    字符串、模板字符串和正则字面量原样保留。
+    """
+    out = []
+    i, n = 0, len(source)
+    line_start = True
+    last_sig = ''  # 上一个非空白字符
+
+    while i < n:
+        ch = source[i]
+
+        if ch in '"\'`':
+            j = i + 1
+            while j < n and source[j] != ch:
+                j += 2 if source[j] == '\\' else 1
+            out.append(source[i:j + 1])
+            last_sig = ch
+            line_start = False
+            i = j + 1
+            continue
+
+        if ch == '/' and i + 1 < n and source[i + 1] == '/':
+            while i < n and source[i] != '\n':
+                i += 1
+            continue
+
+        if ch == '/' and i + 1 < n and source[i + 1] == '*':
+            end = source.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            continue
+
+        if ch == '/' and _regex_allowed(out, last_sig):
+            j = i + 1
+            in_class = False
+            while j < n and source[j] != '\n':
+                c = source[j]
+                if c == '\\':
+                    j += 2
+                    continue
+                if c == '[':
+                    in_class = True
+                elif c == ']':
+                    in_class = False
+                elif c == '/' and not in_class:
+                    break
+                j += 1
+            out.append(source[i:j + 1])
+            last_sig = '/'
+            line_start = False
+            i = j + 1
+            continue
+
+        if ch == '\n':
+            while out and out[-1] in (' ', '\t'):
+                out.pop()
+            if out and out[-1] != '\n':
+                out.append('\n')
+            line_start = True
+            i += 1
+            continue
+
+        if ch in ' \t\r':
+            if not line_start and out and out[-1] != ' ':
+                out.append(' ')
+            i += 1
+            continue
+
+        out.append(ch)
+        last_sig = ch
+        line_start = False
+        i += 1
+
+    return ''.join(out).strip() + '\n'
+
+
+MINIFIERS = {
+    '.css': minify_css,
+    '.js': minify_js,
+}
+
+
+# ================= 构建 =================
+
+def fingerprint(content, length=10):
+    return hashlib.sha256(content).hexdigest()[:length]
+
+
+def build(static_dir, files=ASSET_FILES, precompress=True):
+    """
+    压缩、加指纹并预压缩 files，返回 manifest 映射。
+    旧的 dist 目录会被整体替换，避免残留过期文件。
+    """
+    dist_dir = os.path.join(static_dir, DIST_DIRNAME)
+    tmp_dir = dist_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    manifest = {}
+    for rel in files:
+        src_path = os.path.join(static_dir, rel)
+        with open(src_path, encoding='utf-8') as f:
+            source = f.read()
+        base, ext = os.path.splitext(rel)
+        minify = MINIFIERS.get(ext)
+        content = (minify(source) if minify else source).encode('utf-8')
+
+        hashed = f'{base}.{fingerprint(content)}{ext}'
+        out_path = os.path.join(tmp_dir, hashed)
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        with open(out_path, 'wb') as f:
+            f.write(content)
+        if precompress:
+            with open(out_path + '.gz', 'wb') as f:
+                f.write(gzip.compress(content, compresslevel=9, mtime=0))
+            if brotli is not None:
+                with open(out_path + '.br', 'wb') as f:
+                    f.write(brotli.compress(content, quality=11))
+        manifest[rel] = hashed
+
+    with open(os.path.join(tmp_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    shutil.rmtree(dist_dir, ignore_errors=True)
+    os.replace(tmp_dir, dist_dir)
+    return manifest
+
+
+def load_manifest(static_dir):
+    """读取 manifest；尚未构建时返回空字典"""
+    path = os.path.join(static_dir, DIST_DIRNAME, MANIFEST_NAME)
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
@@ -0,0 +1,221 @@
+"""
+批量生成选手签到二维码（胸牌）：每人一个二维码，链接里带选手 id（与 /admin/qrcode 单个生成的链接相同）。
+
+    flask --app app badges -o badges.pdf --group peak --base-url https://sign.example.com
+    flask --app app badges -o badges.zip --checked-in
+
+PDF：A4 纸每页 3 x 4 个，二维码下方印姓名、组别和序号，带浅色裁切线；
+中文用阅读器内置的 STSong-Light（Adobe-GB1）字体，不嵌入字体文件，因此只依赖 qrcode 包。
+ZIP：每人一张 PNG（1 位灰度），文件名为 组别/序号_姓名_id.png。
+
+二维码编码（选择版本和掩码）是纯 Python 计算，每个约 5~10 ms，由调用方放到进程池里并行；
+render_badge / render_badges 只接收和返回普通的 tuple / bytes，可以直接提交给 ProcessPoolExecutor。
+PDF 和 ZIP 都是边生成边产出 bytes，适合直接作为流式响应。
+"""
+import re
+import struct
+import zlib
+
+try:
+    import qrcode  # 可选依赖
+    from qrcode.constants import ERROR_CORRECT_H
+except ImportError:
+    qrcode = None
+
+PNG_MODULE_PX = 10      # PNG 中每个模块的像素数
+QR_BORDER = 2           # 静区宽度（模块数）
+
+# A4，单位 pt
+PAGE_WIDTH, PAGE_HEIGHT = 595.28, 841.89
+PAGE_MARGIN = 36
+GRID_COLS, GRID_ROWS = 3, 4
+QR_SIZE = 130
+NAME_SIZE = 14
+INFO_SIZE = 9
+
+
+def available():
+    return qrcode is not None
+
+
+def qr_matrix(text):
+    """二维码模块矩阵（含静区），True 为深色"""
+    qr = qrcode.QRCode(error_correction=ERROR_CORRECT_H, border=QR_BORDER)
+    qr.add_data(text)
+    qr.make(fit=True)
+    return qr.get_matrix()
+
+
+def _pack_rows(matrix, scale):
+    """1 位灰度的行数据（0 为黑），每行按字节对齐，每个模块横竖各重复 scale 次"""
+    rows = []
+    for row in matrix:
+        bits = ''.join(('0' if dark else '1') * scale for dark in row)
+        bits += '1' * (-len(bits) % 8)
+        packed = int(bits, 2).to_bytes(len(bits) // 8, 'big')
+        rows.extend([packed] * scale)
+    return rows
+
+
+def _png(matrix, scale=PNG_MODULE_PX):
+    size = len(matrix) * scale
+    raw = b''.join(b'\x00' + row for row in _pack_rows(matrix, scale))
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 1, 0, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw, 9))
+            + chunk(b'IEND', b''))
+
+
+def render_badge(item):
+    """
+    item: (格式, 链接, 其余字段...)；返回 (格式相关的数据, 其余字段...)。
+    pdf 返回 (模块数, deflate 后的 1 位图像)，zip 返回 PNG 文件内容。
+    """
+    fmt, link, *rest = item
+    matrix = qr_matrix(link)
+    if fmt == 'pdf':
+        data = (len(matrix), zlib.compress(b''.join(_pack_rows(matrix, 1)), 9))
+    else:
+        data = _png(matrix)
+    return (data, *rest)
+
+
+def render_badges(items):
+    """一组 render_badge（进程池里按组提交，摊薄每次提交的开销）"""
+    return [render_badge(item) for item in items]
+
+
+# ================= PDF =================
+
+def _pdf_text(text):
+    """UniGB-UCS2-H 编码的十六进制字符串；基本平面以外的字符（如部分 emoji）换成问号"""
+    return '<' + ''.join(f'{ord(ch) if ord(ch) <= 0xFFFF else 0x3F:04X}' for ch in text) + '>'
+
+
+def _text_width(text, size):
+    # 汉字等宽 1 em，ASCII 按半角（与 /W 中 1..95 的宽度一致）
+    return sum(1.0 if ord(ch) >= 0x2E80 else 0.5 for ch in text) * size
+
+
+def _fit(text, size, width):
+    while text and _text_width(text, size) > width:
+        text = text[:-1]
+    return text
+
+
+_FONT_OBJECTS = [
+    b'<< /Type /Font /Subtype /Type0 /BaseFont /STSong-Light /Encoding /UniGB-UCS2-H '
+    b'/DescendantFonts [4 0 R] >>',
+    b'<< /Type /Font /Subtype /CIDFontType0 /BaseFont /STSong-Light '
+    b'/CIDSystemInfo << /Registry (Adobe) /Ordering (GB1) /Supplement 2 >> '
+    b'/FontDescriptor 5 0 R /DW 1000 /W [1 95 500] >>',
+    b'<< /Type /FontDescriptor /FontName /STSong-Light /Flags 6 /FontBBox [-25 -254 1000 880] '
+    b'/ItalicAngle 0 /Ascent 880 /Descent -120 /CapHeight 880 /StemV 93 >>',
+]
+
+
+class _PdfWriter:
+    """顺序写对象并记下偏移量，最后写交叉引用表；对象 1 为 Catalog，2 为 Pages（最后写）"""
+
+    def __init__(self):
+        self.offsets = {}
+        self.position = 0
+        self.next_number = 6    # 1~5：Catalog、Pages、字体三个对象
+
+    def raw(self, data):
+        self.position += len(data)
+        return data
+
+    def obj(self, number, body, stream=None):
+        self.offsets[number] = self.position
+        out = f'{number} 0 obj\n'.encode() + body
+        if stream is not None:
+            out += b'\nstream\n' + stream + b'\nendstream'
+        return self.raw(out + b'\nendobj\n')
+
+    def allocate(self):
+        self.next_number += 1
+        return self.next_number - 1
+
+    def trailer(self):
+        xref = self.position
+        count = self.next_number
+        lines = [b'xref\n', f'0 {count}\n'.encode(), b'0000000000 65535 f \n']
+        lines += [f'{self.offsets[n]:010d} 00000 n \n'.encode() for n in range(1, count)]
+        lines.append(f'trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode())
+        return self.raw(b''.join(lines))
+
+
+def _page(writer, badges):
+    """badges: [((模块数, 图像数据), 姓名, 说明), ...]，返回 (页对象号, 要写出的 bytes)"""
+    cell_w = (PAGE_WIDTH - 2 * PAGE_MARGIN) / GRID_COLS
+    cell_h = (PAGE_HEIGHT - 2 * PAGE_MARGIN) / GRID_ROWS
+    out = []
+    images = []
+    ops = ['0.8 G 0.5 w']
+    for i, ((modules, data), name, info) in enumerate(badges):
+        image = writer.allocate()
+        out.append(writer.obj(image, (
+            f'<< /Type /XObject /Subtype /Image /Width {modules} /Height {modules} '
+            f'/ColorSpace /DeviceGray /BitsPerComponent 1 /Interpolate false '
+            f'/Filter /FlateDecode /Length {len(data)} >>'
+        ).encode(), data))
+        images.append(f'/Im{i} {image} 0 R')
+
+        x = PAGE_MARGIN + (i % GRID_COLS) * cell_w
+        y = PAGE_HEIGHT - PAGE_MARGIN - (i // GRID_COLS + 1) * cell_h
+        qr_x, qr_y = x + (cell_w - QR_SIZE) / 2, y + cell_h - QR_SIZE - 12
+        name = _fit(name, NAME_SIZE, cell_w - 12)
+        info = _fit(info, INFO_SIZE, cell_w - 12)
+        ops += [
+            f'{x:.2f} {y:.2f} {cell_w:.2f} {cell_h:.2f} re S',
+            f'q {QR_SIZE} 0 0 {QR_SIZE} {qr_x:.2f} {qr_y:.2f} cm /Im{i} Do Q',
+            f'BT /F1 {NAME_SIZE} Tf {x + (cell_w - _text_width(name, NAME_SIZE)) / 2:.2f} {qr_y - 20:.2f} Td '
+            f'{_pdf_text(name)} Tj ET',
+            f'BT /F1 {INFO_SIZE} Tf {x + (cell_w - _text_width(info, INFO_SIZE)) / 2:.2f} {qr_y - 34:.2f} Td '
+            f'{_pdf_text(info)} Tj ET',
+        ]
+
+    content = zlib.compress('\n'.join(ops).encode('ascii'))
+    content_number = writer.allocate()
+    out.append(writer.obj(content_number, f'<< /Filter /FlateDecode /Length {len(content)} >>'.encode(), content))
+    page_number = writer.allocate()
+    out.append(writer.obj(page_number, (
+        f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] '
+        f'/Resources << /Font << /F1 3 0 R >> /XObject << {" ".join(images)} >> >> '
+        f'/Contents {content_number} 0 R >>'
+    ).encode()))
+    return page_number, b''.join(out)
+
+
+def pdf_stream(badges):
+    """badges: render_badge('pdf', ...) 结果 ((模块数, 图像数据), 姓名, 说明) 的迭代器；每页产出一次"""
+    writer = _PdfWriter()
+    yield writer.raw(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n') + writer.obj(1, b'<< /Type /Catalog /Pages 2 0 R >>') \
+        + b''.join(writer.obj(n, body) for n, body in enumerate(_FONT_OBJECTS, start=3))
+    pages = []
+    per_page = GRID_COLS * GRID_ROWS
+    batch = []
+    for badge in badges:
+        batch.append(badge)
+        if len(batch) == per_page:
+            number, data = _page(writer, batch)
+            pages.append(number)
+            batch = []
+            yield data
+    if batch or not pages:
+        number, data = _page(writer, batch)
+        pages.append(number)
+        yield data
+    kids = ' '.join(f'{n} 0 R' for n in pages)
+    yield writer.obj(2, f'<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>'.encode()) + writer.trailer()
+
+
+def png_filename(folder, name, number, ident):
+    """zip 中的文件名；去掉路径分隔符等不能出现在文件名里的字符"""
+    safe = re.sub(r'[\\/:*?"<>|\x00-\x1f]', '_', name).strip() or 'player'
+    return f'{folder}/{number if number is not None else "-"}_{safe}_{ident}.png'
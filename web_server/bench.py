@@ -0,0 +1,532 @@
+"""
+性能基准脚本（不依赖正在运行的服务器，直接导入 app 在进程内测量）
+
+用法：
+    python bench.py json [--players 1500]
+    python bench.py compress [--players 1500]
+    python bench.py login [--clients 16] [--logins 200]
+    python bench.py checkin [--players 600] [--clients 32]
+    python bench.py db --url sqlite:////tmp/a.db --url postgresql://localhost/gamesign_bench
+    python bench.py ratings [--players 5000] [--matches 100000] [--shape tournament|random]
+    python bench.py scan [--players 300] [--clients 16]
+
+默认使用临时目录中的独立数据库，不会改动 data.db（可用 DATABASE_URL 覆盖）。
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault(
+    'DATABASE_URL',
+    'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='gamesign-bench-'), 'bench.db')
+)
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+import app as web  # noqa: E402
+import ratings  # noqa: E402
+
+web.init_app_resources(web.app)
+
+
+GROUPS = ['beginner', 'advanced', 'peak']
+STATUSES = ['none', 'top16', 'revival', 'eliminated', 'top8', 'top4']
+SURNAMES = '张王李赵刘陈杨黄周吴徐孙胡朱高林何郭马罗'
+GIVEN = '萌新进阶巅峰星光雪月风花初音未来镜音铃连'
+
+
+def fake_name(i):
+    return random.choice(SURNAMES) + ''.join(random.choice(GIVEN) for _ in range(2)) + str(i)
+
+
+def fake_players(n):
+    """与 /api/v1/admin/players_all 相同结构的选手数据"""
+    players = []
+    for i in range(1, n + 1):
+        scored = random.random() < 0.8
+        players.append({
+            'id': i,
+            'name': fake_name(i),
+            'checked_in': random.random() < 0.9,
+            'match_number': i,
+            'group': random.choice(GROUPS),
+            'on_machine': random.random() < 0.05,
+            'promotion_status': random.choice(STATUSES),
+            'rating': random.randint(10000, 16500),
+            'score_round1': round(random.uniform(90, 101), 4) if scored else None,
+            'score_revival': None,
+        })
+    return players
+
+
+def timeit(fn, repeat):
+    best = float('inf')
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best
+
+
+def bench_json(args):
+    random.seed(args.seed)
+    players = fake_players(args.players)
+    payloads = {
+        'players_all': {'success': True, 'code': 200, 'data': players},
+        'rankings': {'success': True, 'code': 200, 'data': [{
+            'rank': idx + 1, 'id': p['id'], 'name': p['name'], 'group': p['group'],
+            'group_label': '萌新组', 'score': p['score_round1'],
+            'promotion_status': p['promotion_status'],
+        } for idx, p in enumerate(players) if p['score_round1'] is not None]},
+        'song_draw_state': {'success': True, 'code': 200, 'data': {
+            'status': 'finished', 'phase': 'qualifier', 'group': 'beginner',
+            'songs': [{'id': i, 'name': f'曲目 {i}', 'image_url': f'/static/songs/{i}.png'}
+                      for i in range(200)],
+            'selected_songs': [], 'selected_song': None, 'updated_at': '2024-01-01T00:00:00',
+        }},
+    }
+
+    std = DefaultJSONProvider(web.app)
+    fast = web.app.json
+    kwargs = {'separators': (',', ':')}
+    print(f"orjson: {'available' if web.orjson else 'not installed (fallback only)'}")
+    print(f"{'payload':<18}{'bytes':>10}{'stdlib us':>12}{'fast us':>12}{'speedup':>10}  identical")
+    for name, payload in payloads.items():
+        a = std.dumps(payload, **kwargs)
+        b = fast.dumps(payload, **kwargs)
+        t_std = timeit(lambda: std.dumps(payload, **kwargs), args.repeat)
+        t_fast = timeit(lambda: fast.dumps(payload, **kwargs), args.repeat)
+        print(f"{name:<18}{len(a):>10}{t_std * 1e6:>12.1f}{t_fast * 1e6:>12.1f}"
+              f"{t_std / t_fast:>9.1f}x  {a == b}")
+
+
+def seed_database(n_players, n_songs=200, app=None):
+    """往（临时）数据库写入一份接近真实规模的名单和曲库"""
+    with (app or web.app).app_context():
+        web.CheckinLog.query.delete()
+        web.Song.query.delete()
+        web.Player.query.delete()
+        for p in fake_players(n_players):
+            p.pop('id')
+            web.db.session.add(web.Player(**p))
+        for i in range(n_songs):
+            web.db.session.add(web.Song(
+                name=f'曲目 {i}', phase='qualifier', group=random.choice(GROUPS[:2]),
+                image_filename=f'{i:04d}.png'
+            ))
+        web.db.session.commit()
+
+
+def admin_client():
+    client = web.app.test_client()
+    with client.session_transaction() as sess:
+        sess['admin_logged_in'] = True
+    return client
+
+
+def bench_compress(args):
+    random.seed(args.seed)
+    seed_database(args.players)
+    client = admin_client()
+    endpoints = ['/admin', '/api/v1/admin/players_all', '/api/v1/players',
+                 '/api/v1/songs', '/api/v1/rankings']
+    encodings = ['gzip'] + (['br'] if web.brotli else [])
+    print(f"brotli: {'available' if web.brotli else 'not installed'}")
+    print(f"{'endpoint':<28}{'raw':>9}" + ''.join(f"{e:>9}{e + ' ms':>9}" for e in encodings))
+    with web.app.app_context():
+        for path in endpoints:
+            body = client.get(path).get_data()
+            row = f"{path:<28}{len(body):>9}"
+            for enc in encodings:
+                out = web.compress_body(body, enc)
+                cpu = timeit(lambda: web.compress_body(body, enc), args.repeat)
+                row += f"{len(out):>9}{cpu * 1e3:>9.2f}"
+            print(row)
+
+
+def bench_login(args):
+    """
+    clients 个线程并发登录，同时另一个线程不停请求 /api/v1/system/info，
+    对比不限制同时计算的哈希个数（workers=0）与限制为 workers 个时的登录吞吐和旁路请求延迟。
+    """
+    password = 'pass1234'
+    with web.app.app_context():
+        web.Player.query.delete()
+        pwhash = web.generate_password_hash(password, web.app.config['PASSWORD_HASH_METHOD'])
+        for i in range(args.clients):
+            web.db.session.add(web.Player(name=f'选手{i}', group='beginner', checked_in=True,
+                                          match_number=i + 1, password_hash=pwhash))
+        web.get_system_state().checkin_enabled = True
+        web.db.session.commit()
+
+    print(f"method: {web.app.config['PASSWORD_HASH_METHOD']}  cpus: {os.cpu_count()}  "
+          f"clients: {args.clients}  logins: {args.logins}")
+    print(f"{'workers':>8}{'logins/s':>10}{'probe p50 ms':>14}{'probe p95 ms':>14}")
+    for workers in [0] + args.workers:
+        web.app.config['PASSWORD_HASH_WORKERS'] = workers
+
+        remaining = [args.logins]
+        lock = threading.Lock()
+        done = threading.Event()
+
+        def login_worker(i):
+            client = web.app.test_client()
+            while True:
+                with lock:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+                resp = client.post('/api/auth/login', json={'name': f'选手{i}', 'password': password})
+                assert resp.status_code == 200, resp.get_data(as_text=True)
+
+        probe_ms = []
+
+        def probe():
+            client = web.app.test_client()
+            while not done.is_set():
+                start = time.perf_counter()
+                client.get('/api/v1/system/info')
+                probe_ms.append((time.perf_counter() - start) * 1e3)
+                time.sleep(0.005)
+
+        threads = [threading.Thread(target=login_worker, args=(i,)) for i in range(args.clients)]
+        prober = threading.Thread(target=probe)
+        prober.start()
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        done.set()
+        prober.join()
+
+        q = statistics.quantiles(probe_ms, n=20)
+        print(f"{workers:>8}{args.logins / elapsed:>10.1f}{statistics.median(probe_ms):>14.1f}{q[18]:>14.1f}")
+
+
+def bench_checkin(args):
+    """
+    clients 个线程并发调用 /api/v1/player/checkin，把 players 名选手全部签到，
+    对比普通模式（逐个事务 MAX + 提交）与高峰模式（只追加流水，后台批量分配序号）。
+    """
+    random.seed(args.seed)
+    seed_database(args.players, n_songs=0)
+    with web.app.app_context():
+        web.get_system_state().checkin_enabled = True
+        web.db.session.commit()
+        names = [p.name for p in web.Player.query.all()]
+
+    print(f"players: {args.players}  clients: {args.clients}")
+    print(f"{'mode':<8}{'checkins/s':>12}{'p95 ms':>9}{'all numbered after s':>22}  numbers ok")
+    for rush in (False, True):
+        with web.app.app_context():
+            web.CheckinLog.query.delete()
+            web.Player.query.update({'checked_in': False, 'match_number': None})
+            web.db.session.commit()
+        web.app.config['CHECKIN_RUSH_MODE'] = rush
+
+        queue = list(names)
+        lock = threading.Lock()
+        latencies = []
+
+        def worker():
+            client = web.app.test_client()
+            while True:
+                with lock:
+                    if not queue:
+                        return
+                    name = queue.pop()
+                start = time.perf_counter()
+                resp = client.post('/api/v1/player/checkin', json={'name': name})
+                latencies.append((time.perf_counter() - start) * 1e3)
+                assert resp.status_code == 200, resp.get_data(as_text=True)
+
+        threads = [threading.Thread(target=worker) for _ in range(args.clients)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        with web.app.app_context():
+            while web.Player.query.filter_by(checked_in=False).count():
+                time.sleep(0.05)
+            settled = time.perf_counter() - start
+            numbers_ok = all(
+                sorted(n for (n,) in web.db.session.query(web.Player.match_number).filter_by(group=g))
+                == list(range(1, web.Player.query.filter_by(group=g).count() + 1))
+                for g in GROUPS
+            )
+
+        p95 = statistics.quantiles(latencies, n=20)[18]
+        print(f"{'rush' if rush else 'normal':<8}{len(names) / elapsed:>12.1f}{p95:>9.1f}{settled:>22.2f}  {numbers_ok}")
+
+
+def bench_db(args):
+    """
+    同一套负载分别跑在各个数据库上：并发签到（检查序号是否唯一、连续）和并发读选手列表。
+    PostgreSQL 需要先建好空库，例如 createdb gamesign_bench。
+    """
+    urls = args.url or [web.app.config['SQLALCHEMY_DATABASE_URI']]
+    print(f"players: {args.players}  clients: {args.clients}")
+    print(f"{'backend':<12}{'checkins/s':>12}{'numbers ok':>12}{'reads/s':>10}{'registers/s':>13}{'renumbers':>11}"
+          f"{'errors':>8}")
+    for url in urls:
+        random.seed(args.seed)
+        app = web.create_app({
+            'SQLALCHEMY_DATABASE_URI': url, 'PASSWORD_HASH_WORKERS': 0,
+            # 只测锁和事务，不测哈希本身
+            'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1',
+        })
+        web.init_app_resources(app)
+        seed_database(args.players, n_songs=0, app=app)
+        with app.app_context():
+            web.Player.query.update({'checked_in': False, 'match_number': None})
+            web.get_system_state().checkin_enabled = True
+            web.db.session.commit()
+            names = [p.name for p in web.Player.query.all()]
+
+        def run(paths):
+            queue = list(paths)
+            lock = threading.Lock()
+
+            def worker():
+                client = app.test_client()
+                while True:
+                    with lock:
+                        if not queue:
+                            return
+                        item = queue.pop()
+                    resp = client.post(item[0], **item[1]) if isinstance(item, tuple) else client.get(item)
+                    assert resp.status_code == 200, resp.get_data(as_text=True)
+
+            threads = [threading.Thread(target=worker) for _ in range(args.clients)]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            return time.perf_counter() - start
+
+        checkin_time = run([('/api/v1/player/checkin', {'json': {'name': n}}) for n in names])
+        with app.app_context():
+            numbers_ok = all(
+                sorted(n for (n,) in web.db.session.query(web.Player.match_number).filter_by(group=g))
+                == list(range(1, web.Player.query.filter_by(group=g).count() + 1))
+                for g in GROUPS
+            )
+        read_time = run(['/api/v1/players'] * args.reads)
+
+        # 注册（先改选手行再取序号）与管理员反复重排序号（先锁 system_state 再改全部选手）同时进行：
+        # 两边加锁顺序不一致时 PostgreSQL 会报死锁，这里统计失败的请求数
+        with app.app_context():
+            web.Player.query.update({'checked_in': False, 'match_number': None, 'password_hash': None})
+            web.db.session.commit()
+        errors = []
+        renumbers = [0]
+        registering = threading.Event()
+        registering.set()
+
+        def renumber():
+            client = app.test_client()
+            admin = {'X-Admin-Token': 'harbin_red_chart_2024'}
+            while registering.is_set():
+                client.post('/api/v1/admin/unlock_generate', json={'password': '1145141919810ax'}, headers=admin)
+                resp = client.post('/api/v1/admin/generate_numbers', headers=admin)
+                if resp.status_code != 200:
+                    errors.append(resp.get_data(as_text=True))
+                renumbers[0] += 1
+
+        def register(name):
+            resp = app.test_client().post('/api/auth/register', data={'name': name, 'password': 'pw'})
+            if resp.status_code != 200:
+                errors.append(resp.get_data(as_text=True))
+
+        renumber_thread = threading.Thread(target=renumber)
+        renumber_thread.start()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.clients) as pool:
+            list(pool.map(register, names))
+        register_time = time.perf_counter() - start
+        registering.clear()
+        renumber_thread.join()
+        with app.app_context():
+            web.db.engine.dispose()
+
+        backend = url.split(':', 1)[0].split('+', 1)[0]
+        print(f"{backend:<12}{len(names) / checkin_time:>12.1f}{str(numbers_ok):>12}{args.reads / read_time:>10.1f}"
+              f"{len(names) / register_time:>13.1f}{renumbers[0]:>11}{len(errors):>8}")
+        if errors:
+            print('  first error:', errors[0][:200])
+
+
+def bench_ratings(args):
+    """Elo 重算：逐场计算的纯 Python 实现 vs 按轮向量化的 NumPy 实现，以及含读写数据库的完整重算"""
+    random.seed(args.seed)
+    p1, p2 = [], []
+    if args.shape == 'tournament':
+        # 每一轮全部选手两两配对（同一轮的对局互不相交），和真实赛事的对局历史形状一致
+        roster = list(range(args.players))
+        while len(p1) < args.matches:
+            random.shuffle(roster)
+            p1.extend(roster[0:len(roster) - 1:2])
+            p2.extend(roster[1::2])
+        del p1[args.matches:], p2[args.matches:]
+    else:
+        for _ in range(args.matches):
+            a, b = random.sample(range(args.players), 2)
+            p1.append(a)
+            p2.append(b)
+    score1 = [float(random.random() < 0.5) for _ in p1]
+    print(f"players: {args.players}  matches: {args.matches}  shape: {args.shape}")
+
+    t = time.perf_counter()
+    expected = ratings._compute_python(args.players, p1, p2, score1, ratings.DEFAULT_K, ratings.DEFAULT_INITIAL, None)
+    print(f"{'python':<10}{(time.perf_counter() - t) * 1000:>10.1f} ms")
+    if ratings.np is None:
+        print(f"{'numpy':<10}{'(未安装)':>10}")
+    else:
+        t = time.perf_counter()
+        got = ratings.compute(args.players, p1, p2, score1)
+        elapsed = time.perf_counter() - t
+        rounds = len(ratings.split_rounds(ratings.np.asarray(p1), ratings.np.asarray(p2)))
+        diff = max(abs(x - y) for x, y in zip(expected, got))
+        print(f"{'numpy':<10}{elapsed * 1000:>10.1f} ms  ({rounds} rounds, max diff {diff:.2e})")
+
+    seed_database(args.players, n_songs=0)
+    with web.app.app_context():
+        web.Match.query.delete()
+        ids = web.db.session.execute(web.db.select(web.Player.id).order_by(web.Player.id)).scalars().all()
+        web.db.session.execute(web.Match.__table__.insert(), [
+            {'phase': 'top16', 'group': 'peak', 'player1_id': ids[a], 'player2_id': ids[b],
+             'winner_id': ids[a] if s else ids[b], 'status': 'finished'}
+            for a, b, s in zip(p1, p2, score1)
+        ])
+        web.db.session.commit()
+        t = time.perf_counter()
+        web.recompute_ratings()
+        print(f"{'recompute':<10}{(time.perf_counter() - t) * 1000:>10.1f} ms  (读对局 + 计算 + 写回选手)")
+
+
+def bench_scan(args):
+    """
+    门口签到的三种方式，clients 个线程并发把 players 名已注册选手全部签到：
+    login = 查姓名 + 登录（密码哈希），name = 按姓名签到接口，scan = 扫胸牌上的签名令牌
+    """
+    password = 'pass1234'
+    random.seed(args.seed)
+    seed_database(args.players, n_songs=0)
+    with web.app.app_context():
+        pwhash = web.generate_password_hash(password, web.app.config['PASSWORD_HASH_METHOD'])
+        web.Player.query.update({'password_hash': pwhash})
+        web.get_system_state().checkin_enabled = True
+        web.db.session.commit()
+        players = [(p.id, p.name) for p in web.Player.query.all()]
+        tokens = {pid: web.checkin_token(pid) for pid, _ in players}
+        token = tokens[players[0][0]]
+        per_verify = timeit(lambda: web.verify_checkin_token(token), 20000)
+    print(f"players: {args.players}  clients: {args.clients}  "
+          f"hash workers: {web.app.config['PASSWORD_HASH_WORKERS']}  verify_checkin_token: {per_verify * 1e6:.1f} us")
+
+    def via_login(client, pid, name):
+        client.post('/api/auth/check_status', json={'name': name})
+        return client.post('/api/auth/login', json={'name': name, 'password': password})
+
+    def via_name(client, pid, name):
+        return client.post('/api/v1/player/checkin', json={'name': name})
+
+    def via_scan(client, pid, name):
+        return client.post('/api/v1/checkin/scan', json={'token': tokens[pid]})
+
+    print(f"{'mode':<8}{'checkins/s':>12}{'p50 ms':>9}{'p95 ms':>9}")
+    for mode, fn in (('login', via_login), ('name', via_name), ('scan', via_scan)):
+        with web.app.app_context():
+            web.Player.query.update({'checked_in': False, 'match_number': None})
+            web.db.session.commit()
+        queue = list(players)
+        lock = threading.Lock()
+        latencies = []
+
+        def worker():
+            client = web.app.test_client()
+            while True:
+                with lock:
+                    if not queue:
+                        return
+                    pid, name = queue.pop()
+                start = time.perf_counter()
+                resp = fn(client, pid, name)
+                latencies.append((time.perf_counter() - start) * 1e3)
+                assert resp.status_code == 200 and resp.get_json()['success'], resp.get_data(as_text=True)
+
+        threads = [threading.Thread(target=worker) for _ in range(args.clients)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        q = statistics.quantiles(latencies, n=20)
+        print(f"{mode:<8}{len(players) / elapsed:>12.1f}{statistics.median(latencies):>9.1f}{q[18]:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed', type=int, default=20240101)
+    sub = parser.add_subparsers(dest='cmd', required=True)
+
+    p = sub.add_parser('json', help='JSON 编码：标准库 vs FastJSONProvider')
+    p.add_argument('--players', type=int, default=1500)
+    p.add_argument('--repeat', type=int, default=20)
+    p.set_defaults(func=bench_json)
+
+    p = sub.add_parser('compress', help='各接口响应压缩前后字节数与 CPU 耗时')
+    p.add_argument('--players', type=int, default=1500)
+    p.add_argument('--repeat', type=int, default=5)
+    p.set_defaults(func=bench_compress)
+
+    p = sub.add_parser('login', help='并发登录：不限制 vs 限制同时计算的哈希个数')
+    p.add_argument('--clients', type=int, default=16)
+    p.add_argument('--logins', type=int, default=200)
+    p.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='依次测试的同时计算上限')
+    p.set_defaults(func=bench_login)
+
+    p = sub.add_parser('checkin', help='签到高峰：普通模式 vs 高峰模式（流水 + 批量分配）')
+    p.add_argument('--players', type=int, default=600)
+    p.add_argument('--clients', type=int, default=32)
+    p.set_defaults(func=bench_checkin)
+
+    p = sub.add_parser('db', help='同一负载在 SQLite / PostgreSQL 上的吞吐对比')
+    p.add_argument('--url', action='append', help='数据库 URI，可重复；默认使用临时 SQLite')
+    p.add_argument('--players', type=int, default=600)
+    p.add_argument('--clients', type=int, default=16)
+    p.add_argument('--reads', type=int, default=300)
+    p.set_defaults(func=bench_db)
+
+
+    p = sub.add_parser('ratings', help='Elo 重算：纯 Python vs NumPy 向量化')
+    p.add_argument('--players', type=int, default=5000)
+    p.add_argument('--matches', type=int, default=100000)
+    p.add_argument('--shape', choices=['tournament', 'random'], default='tournament',
+                   help='tournament: 每轮全员配对；random: 每场随机抽两名选手')
+    p.set_defaults(func=bench_ratings)
+
+    p = sub.add_parser('scan', help='门口签到：姓名 + 密码登录 vs 姓名签到 vs 扫码令牌')
+    p.add_argument('--players', type=int, default=300)
+    p.add_argument('--clients', type=int, default=16)
+    p.set_defaults(func=bench_scan)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""
+机台排队：N 台机台共用一条按序号排列的队伍，每台机台在当前选手还在打的时候就叫好下一位，
+机台一空出来下一位就能上机；叫到的人迟迟不来就改叫后面的人，迟到者往后顺延。
+
+    flask --app app cabinet-sim --cabinets 6 --players 300     # 模拟：人工叫号 vs 自动排队，每小时完成人数
+
+plan() 只做决策、不碰数据库：输入机台状态和排好序的候选队伍，输出要撤销的叫号和新的叫号。
+
+等待时间估算：SessionDurations 按组别保留最近若干次上机时长（滚动窗口，增删都是 O(1)），
+estimate_wait() 用 前面的人数 / 可用机台数 x 平均时长 估算，正在打的那一轮按剩一半计。
+"""
+import heapq
+import math
+import random
+from collections import deque
+
+# 迟到一次在队伍里往后顺延的位置数
+DEFAULT_LATE_PENALTY = 5
+
+
+def queue_key(match_number, late_count, group_rank, ident, penalty=DEFAULT_LATE_PENALTY):
+    """队伍顺序：序号（迟到者加上顺延位置）、组别、id"""
+    return (match_number + (late_count or 0) * penalty, group_rank, match_number, ident)
+
+
+def plan(cabinets, queue, now, late_after):
+    """
+    cabinets: [{'id', 'group', 'player', 'next', 'called_at', 'freed_at'}, ...]，只含启用的机台；
+      player 为正在打的选手，next 为已叫到的下一位，时间为 datetime（freed_at 为机台最近一次空出来的时间）。
+    queue: [(选手 id, 组别), ...]，已按 queue_key 排好序，不含正在打和已被叫到的选手。
+    返回 (late, calls)：late 为迟到、需要撤销叫号的选手 id；calls 为新的叫号 {机台 id: 选手 id}。
+    机台空出来后，叫到的人超过 late_after 秒还没上机即视为迟到。
+    """
+    late = []
+    open_cabinets = []
+    for cab in cabinets:
+        if cab['next'] is not None and cab['player'] is None:
+            waiting_since = max(t for t in (cab['called_at'], cab['freed_at']) if t is not None)
+            if (now - waiting_since).total_seconds() > late_after:
+                late.append(cab['next'])
+                cab = dict(cab, next=None)
+        if cab['next'] is None:
+            open_cabinets.append(cab)
+
+    # 空着的机台先叫人，其次是正在使用的
+    open_cabinets.sort(key=lambda c: (c['player'] is not None, c['id']))
+    calls = {}
+    taken = set(late)
+    for cab in open_cabinets:
+        for ident, group in queue:
+            if ident in taken:
+                continue
+            if cab['group'] is None or cab['group'] == group:
+                calls[cab['id']] = ident
+                taken.add(ident)
+                break
+    return late, calls
+
+
+# ================= 等待时间 =================
+
+class SessionDurations:
+    """每个组别最近 window 次上机时长（秒）的滚动窗口，维护窗口内总和，平均值 O(1)"""
+
+    def __init__(self, window=50):
+        self.window = window
+        self._samples = {}
+        self._sums = {}
+
+    def add(self, group, seconds):
+        samples = self._samples.setdefault(group, deque())
+        samples.append(seconds)
+        self._sums[group] = self._sums.get(group, 0.0) + seconds
+        if len(samples) > self.window:
+            self._sums[group] -= samples.popleft()
+
+    def count(self, group):
+        return len(self._samples.get(group, ()))
+
+    def mean(self, group, default):
+        """窗口内的平均时长；没有样本时返回 default"""
+        n = self.count(group)
+        return self._sums[group] / n if n else default
+
+
+def estimate_wait(ahead, capacity, free, mean):
+    """
+    前面还有 ahead 人、可用机台 capacity 台（其中 free 台空着）、平均每人 mean 秒时，大约还要等多少秒。
+    机台都在使用时，正在打的这一轮按剩一半计；capacity 为 0 时无法估算，返回 None。
+    """
+    if capacity <= 0:
+        return None
+    if ahead < free:
+        return 0.0
+    return ((ahead - free) // capacity + 0.5) * mean
+
+
+def wait_minutes(seconds):
+    """向上取整到分钟（返回给选手的数值只在有人上下机时变化，不随时间跳动）"""
+    return None if seconds is None else math.ceil(seconds / 60)
+
+
+# ================= 模拟 =================
+
+def simulate(players, cabinets, policy, session=180.0, session_sd=45.0, walk=40.0, call_delay=45.0,
+             changeover=15.0, late_prob=0.05, late_after=90.0, absent=300.0, seed=0):
+    """
+    事件驱动的模拟，时间单位为秒。
+    manual：机台空出来后工作人员才叫号（平均 call_delay 秒后），选手再走过来（平均 walk 秒）；
+    auto：当前选手一上机就叫好下一位，下一位在对方打的时候走过来，机台空出来后只剩换人时间。
+    叫到的选手以 late_prob 的概率不在场：等 late_after 秒后改叫下一位，不在场的人 absent 秒后回来、往后顺延再排。
+    返回 {'players_per_hour', 'utilization', 'makespan_min', 'mean_wait_min'}。
+    """
+    rng = random.Random(seed)
+    durations = [max(30.0, rng.gauss(session, session_sd)) for _ in range(players)]
+    present_after = [absent if rng.random() < late_prob else 0.0 for _ in range(players)]
+    queue = list(range(players))          # 按序号排好
+    requeued = []                         # (可以再叫的时间, 选手)
+    free = [(0.0, c) for c in range(cabinets)]
+    heapq.heapify(free)
+    called = {}                           # auto：机台 -> (叫号时间, 选手)
+    busy_total = 0.0
+    wait_total = 0.0
+    finish = 0.0
+    done = 0
+
+    def next_player(t):
+        while requeued and requeued[0][0] <= t:
+            _, p = heapq.heappop(requeued)
+            queue.insert(min(len(queue), DEFAULT_LATE_PENALTY), p)
+        if queue:
+            return queue.pop(0)
+        if requeued:
+            return heapq.heappop(requeued)[1]
+        return None
+
+    def arrive(p, t_call):
+        """叫号后选手到场的时间；不在场（第一次叫号时）返回 None 并安排其回来后重新排队"""
+        if present_after[p]:
+            heapq.heappush(requeued, (t_call + present_after[p], p))
+            present_after[p] = 0.0
+            return None
+        return t_call + rng.expovariate(1.0 / walk)
+
+    while done < players:
+        t_free, cab = heapq.heappop(free)
+        start = None
+        if policy == 'auto' and cab in called:
+            t_call, p = called.pop(cab)
+            arrived = arrive(p, t_call)
+            if arrived is not None:
+                start = max(t_free + changeover, arrived)
+            else:
+                t_free += late_after
+        while start is None:
+            t_call = t_free if policy == 'auto' else t_free + rng.expovariate(1.0 / call_delay)
+            p = next_player(t_call)
+            if p is None:
+                break
+            arrived = arrive(p, t_call)
+            if arrived is None:
+                t_free = t_call + late_after
+                continue
+            start = max(t_free + changeover, arrived)
+        if start is None:
+            continue
+        end = start + durations[p]
+        wait_total += start
+        busy_total += durations[p]
+        finish = max(finish, end)
+        done += 1
+        if policy == 'auto':
+            q = next_player(start)
+            if q is not None:
+                called[cab] = (start, q)
+        heapq.heappush(free, (end, cab))
+
+    return {
+        'players_per_hour': players / (finish / 3600.0),
+        'utilization': busy_total / (cabinets * finish),
+        'makespan_min': finish / 60.0,
+        'mean_wait_min': wait_total / players / 60.0,
+    }
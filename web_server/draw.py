@@ -0,0 +1,100 @@
+"""
+曲目抽选：按权重不重复抽取，每次抽选记录随机种子，可以原样重放核对。
+
+    flask --app app song-draw-log                 # 查看抽选记录（种子、候选数、结果）
+    flask --app app song-draw-log --replay 12     # 用记录的种子重放第 12 次抽选，核对结果是否一致
+
+每个 (赛程, 组别) 的曲库建一张别名表（Vose 算法），加权抽一首是 O(1)；曲库变化（曲目版本号变化）时才重建。
+本场已经抽到过的曲目不再抽：先在整张表上抽，抽到已排除的就重抽；
+已排除的权重超过一半时，改用只含剩余曲目的临时表（缓存在原表上，见 AliasTable.without），避免反复重抽。
+抽选只依赖 (候选列表, 权重, 排除集合, 种子)，所以同样的输入一定得到同样的结果。
+"""
+import math
+import random
+
+
+class AliasTable:
+    """ids 与 weights 一一对应；权重须为有限的正数"""
+
+    def __init__(self, ids, weights):
+        n = len(ids)
+        if n == 0:
+            raise ValueError('候选曲目为空')
+        if any(not (0 < w < math.inf) for w in weights):   # nan 的比较总是 False，也在这里拒绝
+            raise ValueError('权重必须是大于 0 的有限数')
+        total = float(sum(weights))
+        self.ids = list(ids)
+        self.weights = [float(w) for w in weights]
+        self.weight_of = dict(zip(self.ids, self.weights))
+        self.total = total
+        self._reduced = None   # (排除集合, 只含其余曲目的表)，只留最近一张
+        self.prob = [0.0] * n
+        self.alias = list(range(n))
+
+        scaled = [w * n / total for w in self.weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large:   # 浮点误差剩下的都视为 1
+            self.prob[i] = 1.0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def sample(self, rng):
+        i = int(rng.random() * len(self.ids))
+        return self.ids[i] if rng.random() < self.prob[i] else self.ids[self.alias[i]]
+
+    def without(self, skip):
+        """只含 skip 以外曲目的表；结果只取决于本表和 skip，重放时重新构建也得到同一张表"""
+        key = frozenset(skip)
+        reduced = self._reduced
+        if reduced is not None and reduced[0] == key:
+            return reduced[1]
+        remaining = [i for i in self.ids if i not in key]
+        table = AliasTable(remaining, [self.weight_of[i] for i in remaining])
+        self._reduced = (key, table)
+        return table
+
+
+def difficulty_weights(rows, bias):
+    """
+    rows: [(id, 基础权重, 定数), ...] -> [(id, 权重), ...]。
+    bias 不为 0 时权重乘以 e^(bias * (定数 - 平均定数))：bias > 0 偏向高定数，< 0 偏向低定数；
+    没有定数（或定数不是有限数）的曲目视为平均定数。权重不是有限正数的曲目不参与抽选。
+    """
+    levels = [d for _, _, d in rows if d is not None and math.isfinite(d)]
+    mean = sum(levels) / len(levels) if levels else 0.0
+    out = []
+    for ident, weight, difficulty in rows:
+        weight = 1.0 if weight is None else weight
+        if bias and difficulty is not None and math.isfinite(difficulty):
+            weight *= math.exp(bias * (difficulty - mean))
+        if 0 < weight < math.inf:
+            out.append((ident, weight))
+    return out
+
+
+def draw(table, k, excluded=(), seed=None):
+    """从 table 中按权重不重复地抽 k 首（excluded 中的不抽）；候选不足 k 首时抽完为止"""
+    rng = random.Random(seed)
+    skip = {i for i in excluded if i in table.weight_of}
+    skip_weight = sum(table.weight_of[i] for i in skip)
+    chosen = []
+    while len(chosen) < k and len(skip) < len(table):
+        current = table
+        if (table.total - skip_weight) * 2 < table.total:
+            current = table.without(skip)
+        while True:
+            pick = current.sample(rng)
+            if pick not in skip:
+                break
+        chosen.append(pick)
+        skip.add(pick)
+        skip_weight += table.weight_of[pick]
+    return chosen
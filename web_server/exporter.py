@@ -0,0 +1,193 @@
+"""
+赛后数据导出：把行迭代器边读边写成 CSV 或 XLSX，产出一段段 bytes，适合直接作为流式响应。
+
+    flask --app app export players -o players.csv
+    flask --app app export all -o results.xlsx
+
+任何时候内存里只有当前这一小段数据；XLSX 不依赖 openpyxl，
+直接以 zip 流的方式写出最小的 Office Open XML 结构（内联字符串，无样式）。
+zip_stream 把任意 (文件名, 内容) 序列写成流式 ZIP（批量二维码等）。
+"""
+import csv
+import io
+import math
+import re
+from xml.sax.saxutils import escape
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
+
+FLUSH_BYTES = 64 * 1024
+CSV_CHUNK_ROWS = 500
+XLSX_BATCH_ROWS = 200
+
+# XML 1.0 不允许的控制字符（Excel 打开时会报文件损坏）
+_XML_ILLEGAL_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+# ================= CSV =================
+
+def csv_stream(header, rows, chunk_rows=CSV_CHUNK_ROWS):
+    """带 BOM 的 UTF-8 CSV（Excel 直接打开中文不乱码），每 chunk_rows 行产出一次"""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    buf.write('\ufeff')
+    writer.writerow(header)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buf.getvalue().encode('utf-8')
+            buf.seek(0)
+            buf.truncate()
+            pending = 0
+    yield buf.getvalue().encode('utf-8')
+
+
+# ================= XLSX =================
+
+class _ChunkSink:
+    """只能追加写入的缓冲区：ZipFile 写进来，生成器定期取走"""
+
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+def _column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _cell(ref, value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and not math.isfinite(value):
+        # <v> 里写 nan / inf 时 Excel 会报文件损坏，按空单元格处理（与 None 一致）
+        return ''
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c r="{ref}"><v>{value!r}</v></c>'
+    text = escape(_XML_ILLEGAL_RE.sub('', str(value)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _row_xml(row_number, values, columns):
+    cells = ''.join(_cell(f'{col}{row_number}', v) for col, v in zip(columns, values))
+    return f'<row r="{row_number}">{cells}</row>'
+
+
+def _sheet_title(title):
+    # 工作表名最长 31 个字符，不能含 []:*?/\
+    return re.sub(r'[\[\]:*?/\\]', '_', title)[:31]
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '{sheets}</Types>'
+)
+_SHEET_CONTENT_TYPE = (
+    '<Override PartName="/xl/worksheets/sheet{n}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>{sheets}</sheets></workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '{rels}</Relationships>'
+)
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+
+def xlsx_stream(sheets, flush_bytes=FLUSH_BYTES):
+    """
+    sheets: [(工作表名, 表头, 行迭代器), ...]，行迭代器按顺序逐个消费。
+    zip 写入不可 seek 的缓冲区（使用数据描述符），每攒够 flush_bytes 产出一次。
+    """
+    sink = _ChunkSink()
+    titles = []
+    with ZipFile(sink, 'w', ZIP_DEFLATED) as zf:
+        for n, (title, header, rows) in enumerate(sheets, start=1):
+            titles.append(_sheet_title(title))
+            columns = [_column_letter(i) for i in range(len(header))]
+            with zf.open(f'xl/worksheets/sheet{n}.xml', 'w', force_zip64=True) as f:
+                f.write(_SHEET_HEAD.encode('utf-8'))
+                batch = [_row_xml(1, header, columns)]
+                for row_number, row in enumerate(rows, start=2):
+                    batch.append(_row_xml(row_number, row, columns))
+                    if len(batch) >= XLSX_BATCH_ROWS:
+                        f.write(''.join(batch).encode('utf-8'))
+                        batch.clear()
+                        if sink.size >= flush_bytes:
+                            yield sink.drain()
+                batch.append(_SHEET_TAIL)
+                f.write(''.join(batch).encode('utf-8'))
+            yield sink.drain()
+
+        zf.writestr('[Content_Types].xml', _CONTENT_TYPES.format(
+            sheets=''.join(_SHEET_CONTENT_TYPE.format(n=n) for n in range(1, len(titles) + 1))
+        ))
+        zf.writestr('_rels/.rels', _ROOT_RELS)
+        zf.writestr('xl/workbook.xml', _WORKBOOK.format(sheets=''.join(
+            f'<sheet name="{escape(t, {chr(34): "&quot;"})}" sheetId="{n}" r:id="rId{n}"/>'
+            for n, t in enumerate(titles, start=1)
+        )))
+        zf.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS.format(rels=''.join(
+            f'<Relationship Id="rId{n}" '
+            f'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{n}.xml"/>'
+            for n in range(1, len(titles) + 1)
+        )))
+    yield sink.drain()
+
+
+# ================= ZIP =================
+
+def zip_stream(files, flush_bytes=FLUSH_BYTES, compress=False):
+    """files: (文件名, bytes) 的迭代器；PNG 等已压缩的内容默认直接存储（compress=False）"""
+    sink = _ChunkSink()
+    with ZipFile(sink, 'w', ZIP_DEFLATED if compress else ZIP_STORED) as zf:
+        for arcname, data in files:
+            zf.writestr(arcname, data)
+            if sink.size >= flush_bytes:
+                yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,70 @@
+"""
+按分数分组：把选手按分数从低到高切成若干段，依次分进由低到高的组别。
+
+    flask --app app plan-groups --share beginner=0.5 --share advanced=0.35 --share peak=0.15
+    flask --app app plan-groups --count peak=32 --pin 12=peak --apply
+
+每组的人数由比例（最大余数法取整）或固定人数给出；被固定（pinned）的选手先占用所在组的名额，
+其余选手按 (分数, id) 排序后依次切分，所以结果是确定的，同分选手不会因为重复预览而来回变动。
+"""
+
+
+def counts_from_shares(total, shares):
+    """按比例分配 total 个名额（最大余数法），返回 {组: 人数}，总和恰好为 total"""
+    weight = sum(shares.values())
+    if weight <= 0:
+        raise ValueError('比例之和必须大于 0')
+    exact = {g: total * s / weight for g, s in shares.items()}
+    counts = {g: int(v) for g, v in exact.items()}
+    leftover = total - sum(counts.values())
+    for g in sorted(exact, key=lambda g: exact[g] - counts[g], reverse=True)[:leftover]:
+        counts[g] += 1
+    return counts
+
+
+def plan(players, groups, counts, pinned=None):
+    """
+    players: [(id, 分数), ...]；groups: 由低到高的组别；counts: {组: 人数}，总和须等于选手数；
+    pinned: {id: 组}。返回 {id: 组}。
+    """
+    pinned = pinned or {}
+    if sum(counts.get(g, 0) for g in groups) != len(players):
+        raise ValueError(f'各组人数之和（{sum(counts.values())}）与选手数（{len(players)}）不一致')
+    remaining = {g: counts.get(g, 0) for g in groups}
+    known = {pid for pid, _ in players}
+    result = {}
+    for pid, group in pinned.items():
+        if pid not in known:
+            raise ValueError(f'固定的选手不存在：{pid}')
+        if group not in remaining:
+            raise ValueError(f'未知组别：{group}')
+        remaining[group] -= 1
+        result[pid] = group
+    over = [g for g in groups if remaining[g] < 0]
+    if over:
+        raise ValueError(f'固定到 {"、".join(over)} 的选手超过了该组人数')
+
+    free = sorted(((rating or 0, pid) for pid, rating in players if pid not in pinned))
+    start = 0
+    for group in groups:
+        end = start + remaining[group]
+        for _, pid in free[start:end]:
+            result[pid] = group
+        start = end
+    return result
+
+
+def summarize(players, assignment, groups):
+    """每组的人数与分数范围 {组: {'count', 'min', 'max', 'mean'}}"""
+    buckets = {g: [] for g in groups}
+    for pid, rating in players:
+        buckets[assignment[pid]].append(rating or 0)
+    return {
+        g: {
+            'count': len(values),
+            'min': min(values) if values else None,
+            'max': max(values) if values else None,
+            'mean': round(sum(values) / len(values), 1) if values else None,
+        }
+        for g, values in buckets.items()
+    }
@@ -0,0 +1,229 @@
+"""
+事件日志（journal）：每个写事务提交后追加一行 JSON，记录触发它的操作和改动的行；定期写整库快照。
+
+    flask --app app journal-log -n 50                 # 按顺序查看最近的操作
+    flask --app app journal-snapshot                  # 立即写一份快照
+    flask --app app journal-restore -o recovered.db   # 最近的快照 + 之后的事件 -> 新的 SQLite 库
+
+日志文件 events.jsonl 一行一个事务：
+    {"seq":12,"ts":"...","action":"main.api_admin_promote_qualifier","admin":true,
+     "changes":[["u","player",5,{"promotion_status":"top16"}],["i","match",3,{...}],["d","song",7]]}
+seq 在同一个数据库事务里递增（与业务数据一起提交），因此全局唯一、与提交顺序一致，缺号说明有事件丢失。
+快照 snapshot-<seq>.json.gz 是 seq 时刻各表的全部行，只保留最近 SNAPSHOT_KEEP 份；events.jsonl 不截断，用作审计。
+
+事件在数据库提交之后才追加（after_commit）：提交成功、fsync 之前进程崩溃时，该事务已在库里却不在日志里。
+日志因此不能代替数据库本身的备份；restore 出来的库最多缺少崩溃前最后几个事务，缺号可以在 journal-log 里看到。
+"""
+import glob
+import gzip
+import json
+import os
+import re
+import threading
+from datetime import date, datetime
+
+import sqlalchemy as sa
+
+try:
+    import fcntl
+except ImportError:  # Windows 上只会单进程运行，不加锁
+    fcntl = None
+
+
+EVENTS_NAME = 'events.jsonl'
+SNAPSHOT_KEEP = 2
+_SNAPSHOT_RE = re.compile(r'snapshot-(\d+)\.json\.gz$')
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def dumps(record):
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=_default)
+
+
+# ================= 追加写入（组提交） =================
+
+class Journal:
+    """
+    多个线程同时提交时，先到的线程把排队中的所有记录一次 write + fsync，
+    其余线程等它完成即可返回（组提交），fsync 次数不随并发数线性增长。
+    多进程之间用 O_APPEND + flock 保证每批记录完整地追加在文件末尾。
+    """
+
+    def __init__(self, directory, fsync=True):
+        self.directory = directory
+        self.path = os.path.join(directory, EVENTS_NAME)
+        self.fsync = fsync
+        self._cond = threading.Condition()
+        self._pending = []
+        self._enqueued = 0
+        self._durable = 0
+        self._writing = False
+        self._fd = None
+        self._pid = None
+
+    def append(self, record):
+        line = dumps(record) + '\n'
+        with self._cond:
+            self._pending.append(line)
+            self._enqueued += 1
+            mine = self._enqueued
+            while self._durable < mine:
+                if self._writing:
+                    self._cond.wait()
+                    continue
+                self._writing = True
+                batch, self._pending = self._pending, []
+                upto = self._enqueued
+                self._cond.release()
+                try:
+                    self._write(''.join(batch).encode('utf-8'))
+                finally:
+                    self._cond.acquire()
+                    self._writing = False
+                    self._durable = upto
+                    self._cond.notify_all()
+
+    def _write(self, data):
+        if self._pid != os.getpid():
+            os.makedirs(self.directory, exist_ok=True)
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            self._pid = os.getpid()
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(self._fd, view):]
+            if self.fsync:
+                os.fsync(self._fd)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+# ================= 读取 =================
+
+def _line_seq(line):
+    # 每行都以 {"seq":N, 开头，不必解析整行 JSON 就能跳过快照之前的事件
+    return int(line[7:line.index(',', 7)])
+
+
+def read_events(directory, after_seq=0):
+    """seq > after_seq 的事件，按 seq 排序（多进程追加时文件里的顺序可能略有交错）"""
+    path = os.path.join(directory, EVENTS_NAME)
+    if not os.path.exists(path):
+        return []
+    events = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.endswith('\n'):
+                break   # 崩溃时写了一半的最后一行
+            if _line_seq(line) > after_seq:
+                events.append(json.loads(line))
+    events.sort(key=lambda e: e['seq'])
+    return events
+
+
+def tail_events(directory, n):
+    path = os.path.join(directory, EVENTS_NAME)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        lines = [line for line in f if line.endswith('\n')]
+    return sorted((json.loads(line) for line in lines[-n:]), key=lambda e: e['seq'])
+
+
+def find_gaps(events, after_seq):
+    expected = after_seq + 1
+    gaps = []
+    for event in events:
+        if event['seq'] > expected:
+            gaps.extend(range(expected, event['seq']))
+        expected = max(expected, event['seq'] + 1)
+    return gaps
+
+
+# ================= 快照 =================
+
+def _snapshot_paths(directory):
+    return sorted(p for p in glob.glob(os.path.join(directory, 'snapshot-*.json.gz')) if _SNAPSHOT_RE.search(p))
+
+
+def write_snapshot(directory, seq, tables):
+    """tables: {表名: [行 dict, ...]}；先写临时文件再改名，崩溃时不会留下半份快照"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'snapshot-{seq:012d}.json.gz')
+    tmp = path + '.tmp'
+    with gzip.open(tmp, 'wt', encoding='utf-8', compresslevel=5) as f:
+        f.write(dumps({'seq': seq, 'tables': tables}))
+    os.replace(tmp, path)
+    for old in _snapshot_paths(directory)[:-SNAPSHOT_KEEP]:
+        os.remove(old)
+    return path
+
+
+def has_snapshot(directory):
+    return bool(_snapshot_paths(directory))
+
+
+def latest_snapshot(directory):
+    """最近一份快照 {'seq', 'tables'}；没有快照时返回 None"""
+    paths = _snapshot_paths(directory)
+    if not paths:
+        return None
+    with gzip.open(paths[-1], 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# ================= 回放 =================
+
+def _coerce(table, values):
+    """JSON 里的日期时间是字符串，写回数据库前按列类型转换"""
+    out = {}
+    for key, value in values.items():
+        column = table.c.get(key)
+        if column is None:
+            continue
+        if isinstance(value, str) and isinstance(column.type, sa.DateTime):
+            value = datetime.fromisoformat(value)
+        elif isinstance(value, str) and isinstance(column.type, sa.Date):
+            value = date.fromisoformat(value)
+        out[key] = value
+    return out
+
+
+def replay(conn, metadata, table_names, snapshot, events):
+    """
+    在 conn 上重建 table_names 各表：有快照时先清空并载入快照，再按 seq 顺序应用之后的事件。
+    返回应用的改动条数。
+    """
+    tables = [t for t in metadata.sorted_tables if t.name in table_names]
+    if snapshot is not None:
+        for table in reversed(tables):
+            conn.execute(table.delete())
+        for table in tables:
+            rows = [_coerce(table, row) for row in snapshot['tables'].get(table.name, [])]
+            if rows:
+                conn.execute(table.insert(), rows)
+
+    by_name = {t.name: t for t in tables}
+    applied = 0
+    for event in events:
+        for change in event['changes']:
+            op, name, ident = change[:3]
+            table = by_name.get(name)
+            if table is None:
+                continue
+            if op == 'd':
+                conn.execute(table.delete().where(table.c.id == ident))
+            elif op == 'i':
+                conn.execute(table.insert().values(_coerce(table, change[3])))
+            else:
+                conn.execute(table.update().where(table.c.id == ident).values(_coerce(table, change[3])))
+            applied += 1
+    return applied
@@ -0,0 +1,289 @@
+"""
+数据库结构迁移：schema_version 表记录当前版本，MIGRATIONS 按版本号依次执行。
+
+    flask --app app db-status      # 查看当前版本 / 待执行的迁移
+    flask --app app db-upgrade     # 立即执行待执行的迁移
+
+应用收到第一个请求时（init_app_resources）调用 upgrade()：已是最新版本时只查一次 schema_version 就返回；
+否则在文件锁内（多个 gunicorn worker 同时启动时只有一个真正执行）重新检查版本后逐个执行。
+
+编写新迁移的约定：
+- 在 MIGRATIONS 末尾追加 (版本号, 说明, 函数)，函数签名为 fn(conn, metadata)
+- 版本 1 按下面冻结的初始表结构（_V1）建表，不随模型变化；之后每个迁移只补自己引入的列 / 表 / 索引
+  （add_missing_columns 传 names），全新数据库也是从版本 1 逐个执行到最新
+- 迁移必须是幂等的（用 add_missing_columns / create_missing_indexes 这类先检查再修改的写法）：
+  引入迁移之前的旧库可能已经有部分列
+"""
+from contextlib import contextmanager
+
+import sqlalchemy as sa
+from sqlalchemy.exc import DBAPIError
+
+try:
+    import fcntl
+except ImportError:  # Windows 上只会单进程运行，不加锁
+    fcntl = None
+
+
+_version_metadata = sa.MetaData()
+schema_version = sa.Table(
+    'schema_version', _version_metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('version', sa.Integer, nullable=False),
+)
+
+
+# ================= 通用（幂等）操作 =================
+
+def _column_ddl(conn, column):
+    ddl = f'{conn.dialect.identifier_preparer.format_column(column)} {column.type.compile(dialect=conn.dialect)}'
+    default = column.default
+    if default is not None and default.is_scalar:
+        literal = sa.literal(default.arg, column.type).compile(
+            dialect=conn.dialect, compile_kwargs={'literal_binds': True}
+        )
+        ddl += f' DEFAULT {literal}'
+    return ddl
+
+
+def add_missing_columns(conn, table, names=None):
+    """
+    表定义里有、库里没有的列用 ALTER TABLE ADD COLUMN 补上，返回补上的列名；
+    names 不为空时只处理这些列
+    """
+    existing = {c['name'] for c in sa.inspect(conn).get_columns(table.name)}
+    added = []
+    preparer = conn.dialect.identifier_preparer
+    for column in table.columns:
+        if column.name in existing or (names is not None and column.name not in names):
+            continue
+        conn.execute(sa.text(f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN {_column_ddl(conn, column)}'))
+        added.append(column.name)
+    return added
+
+
+def create_missing_indexes(conn, table):
+    existing = {ix['name'] for ix in sa.inspect(conn).get_indexes(table.name)}
+    created = []
+    for index in table.indexes:
+        if index.name not in existing:
+            index.create(conn)
+            created.append(index.name)
+    return created
+
+
+# ================= 初始表结构（版本 1，冻结） =================
+# 引入迁移时模型的样子；之后模型的改动都写成新的迁移，不要修改这里
+
+_V1 = sa.MetaData()
+
+sa.Table(
+    'player', _V1,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('name', sa.String(80), unique=True, nullable=False),
+    sa.Column('checked_in', sa.Boolean, default=False),
+    sa.Column('match_number', sa.Integer, nullable=True),
+    sa.Column('group', sa.String(20), default='beginner'),
+    sa.Column('on_machine', sa.Boolean, default=False),
+    sa.Column('promotion_status', sa.String(20), default='none'),
+    sa.Column('rating', sa.Integer, default=0),
+    sa.Column('score_round1', sa.Float, nullable=True),
+    sa.Column('score_round2', sa.Float, nullable=True),
+    sa.Column('score_revival', sa.Float, nullable=True),
+    sa.Column('forfeited', sa.Boolean, default=False),
+    sa.Column('ban_used', sa.Boolean, default=False),
+    sa.Column('password_hash', sa.String(128), nullable=True),
+    sa.Column('avatar_filename', sa.String(128), nullable=True),
+    sa.Index('ix_player_group_checked_in', 'group', 'checked_in', 'match_number'),
+)
+
+sa.Table(
+    'match', _V1,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('phase', sa.String(20)),
+    sa.Column('group', sa.String(20)),
+    sa.Column('player1_id', sa.Integer, sa.ForeignKey('player.id')),
+    sa.Column('player2_id', sa.Integer, sa.ForeignKey('player.id')),
+    sa.Column('winner_id', sa.Integer, nullable=True),
+    sa.Column('status', sa.String(20), default='pending'),
+    sa.Index('ix_match_phase_group', 'phase', 'group'),
+)
+
+sa.Table(
+    'song_selection', _V1,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('match_id', sa.Integer, sa.ForeignKey('match.id')),
+    sa.Column('player_id', sa.Integer, sa.ForeignKey('player.id')),
+    sa.Column('song_name', sa.String(200)),
+    sa.Column('difficulty', sa.Integer),
+    sa.Column('is_banned', sa.Boolean, default=False),
+    sa.Column('banned_by_id', sa.Integer, nullable=True),
+    sa.Index('ix_song_selection_match', 'match_id'),
+)
+
+sa.Table(
+    'song', _V1,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('name', sa.String(200), nullable=False),
+    sa.Column('phase', sa.String(20), nullable=False),
+    sa.Column('group', sa.String(20), nullable=False),
+    sa.Column('image_filename', sa.String(255), nullable=True),
+    sa.Column('active', sa.Boolean, default=True),
+    sa.Index('ix_song_phase_group', 'phase', 'group'),
+)
+
+sa.Table(
+    'system_state', _V1,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('match_generated', sa.Boolean, default=False),
+    sa.Column('match_started', sa.Boolean, default=False),
+    sa.Column('checkin_enabled', sa.Boolean, default=False),
+    sa.Column('start_time', sa.DateTime, nullable=True),
+    sa.Column('checkin_timeout_processed', sa.Boolean, default=False),
+)
+
+sa.Table(
+    'song_draw_state', _V1,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('status', sa.String(20), default='idle'),
+    sa.Column('phase', sa.String(20), nullable=True),
+    sa.Column('group', sa.String(20), nullable=True),
+    sa.Column('selected_song_ids', sa.String(200), nullable=True),
+    sa.Column('updated_at', sa.DateTime),
+)
+
+sa.Table(
+    'cache_version', _V1,
+    sa.Column('entity', sa.String(40), primary_key=True),
+    sa.Column('version', sa.Integer, nullable=False, default=0),
+)
+
+sa.Table(
+    'checkin_log', _V1,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('player_id', sa.Integer, nullable=False, index=True),
+    sa.Column('created_at', sa.DateTime),
+    sa.Column('applied_at', sa.DateTime, nullable=True, index=True),
+)
+
+
+# ================= 迁移 =================
+
+def _baseline(conn, metadata):
+    """按冻结的初始表结构建表；旧库补齐缺失的列（取代原先导入时的 create_all + ALTER TABLE 尝试）"""
+    _V1.create_all(conn)
+    for table in _V1.sorted_tables:
+        add_missing_columns(conn, table)
+
+    state = _V1.tables['system_state']
+    if conn.execute(sa.select(state.c.id).where(state.c.id == 1)).first() is None:
+        conn.execute(state.insert().values(
+            id=1, match_generated=False, match_started=False, checkin_enabled=False
+        ))
+    for name in ('match_started', 'checkin_enabled', 'checkin_timeout_processed'):
+        column = state.c[name]
+        conn.execute(state.update().where(column.is_(None)).values({name: False}))
+
+    draw = _V1.tables['song_draw_state']
+    if conn.execute(sa.select(draw.c.id).where(draw.c.id == 1)).first() is None:
+        conn.execute(draw.insert().values(id=1, status='idle'))
+
+
+def _hot_indexes(conn, metadata):
+    """签到取最大序号、按赛程/组别取曲目和对局等热点查询的索引"""
+    for name in ('player', 'song', 'match', 'song_selection'):
+        create_missing_indexes(conn, _V1.tables[name])
+
+
+def _player_elo(conn, metadata):
+    """选手 Elo 等级分列（已有选手取默认值）"""
+    add_missing_columns(conn, metadata.tables['player'], names={'elo'})
+
+
+def _song_draw(conn, metadata):
+    """曲目定数 / 抽选权重列，抽选记录表"""
+    add_missing_columns(conn, metadata.tables['song'], names={'difficulty', 'weight'})
+    metadata.tables['song_draw_log'].create(conn, checkfirst=True)
+
+
+def _cabinets(conn, metadata):
+    """机台表，选手叫号迟到次数列"""
+    add_missing_columns(conn, metadata.tables['player'], names={'queue_late'})
+    metadata.tables['cabinet'].create(conn, checkfirst=True)
+
+
+def _machine_sessions(conn, metadata):
+    """上机记录表（等待时间估算），选手本次上机时间列"""
+    add_missing_columns(conn, metadata.tables['player'], names={'machine_on_at'})
+    metadata.tables['machine_session'].create(conn, checkfirst=True)
+
+
+MIGRATIONS = [
+    (1, '初始表结构，补齐旧库缺失的列', _baseline),
+    (2, '热点查询索引', _hot_indexes),
+    (3, '选手 Elo 等级分', _player_elo),
+    (4, '曲目抽选权重与抽选记录', _song_draw),
+    (5, '机台排队', _cabinets),
+    (6, '上机记录', _machine_sessions),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# ================= 执行 =================
+
+def read_version(conn):
+    """当前版本；schema_version 表不存在时返回 0"""
+    try:
+        return conn.execute(sa.select(schema_version.c.version).where(schema_version.c.id == 1)).scalar() or 0
+    except DBAPIError:
+        conn.rollback()
+        return 0
+
+
+def _write_version(conn, version):
+    updated = conn.execute(
+        schema_version.update().where(schema_version.c.id == 1).values(version=version)
+    ).rowcount
+    if not updated:
+        conn.execute(schema_version.insert().values(id=1, version=version))
+
+
+@contextmanager
+def _file_lock(path):
+    if fcntl is None or path is None:
+        yield
+        return
+    with open(path, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def pending(engine):
+    with engine.connect() as conn:
+        version = read_version(conn)
+    return [(v, desc) for v, desc, _ in MIGRATIONS if v > version]
+
+
+def upgrade(engine, metadata, lock_path=None):
+    """执行所有未完成的迁移，返回 [(版本号, 说明)]；已是最新时只有一次查询"""
+    with engine.connect() as conn:
+        if read_version(conn) >= LATEST_VERSION:
+            return []
+
+    applied = []
+    with _file_lock(lock_path):
+        with engine.begin() as conn:
+            _version_metadata.create_all(conn)
+        for version, desc, fn in MIGRATIONS:
+            # 拿到锁之后重新读取版本：别的进程可能已经执行过了
+            with engine.begin() as conn:
+                if read_version(conn) >= version:
+                    continue
+                fn(conn, metadata)
+                _write_version(conn, version)
+            applied.append((version, desc))
+    return applied
@@ -0,0 +1,118 @@
+"""
+Elo 等级分：按对局历史重算全部选手的分数，或在单场对局结束时增量更新两名选手。
+
+    flask --app app recompute-ratings
+
+Elo 必须按时间顺序逐场更新，但互不相关的对局之间没有依赖：
+把按时间排好的对局切成连续的若干"轮"，同一轮里每名选手最多出现一次，
+于是每一轮可以用 NumPy 一次性向量化计算，结果与逐场计算完全一致。
+切分本身也是向量化的（先算出每场对局双方上一场的位置），不需要逐场的 Python 循环。
+未安装 NumPy、或历史切出的轮太碎（平均每轮不足 MIN_ROUND_SIZE 场）时退回逐场计算的纯 Python 实现。
+"""
+try:
+    import numpy as np  # 可选依赖
+except ImportError:
+    np = None
+
+
+DEFAULT_K = 32.0
+DEFAULT_INITIAL = 1500.0
+
+# 每轮的 NumPy 调用开销约合几十场逐场计算：平均每轮少于这么多场时直接逐场计算
+MIN_ROUND_SIZE = 64
+# 估算每轮大小时先切开头的这么多场
+ROUND_PROBE = 4096
+
+
+def expected_score(rating_a, rating_b):
+    return 1.0 / (1.0 + 10.0 ** ((rating_b - rating_a) / 400.0))
+
+
+def update_pair(rating_a, rating_b, score_a, k=DEFAULT_K):
+    """一场对局后的新分数；score_a 为 A 的得分（胜 1、负 0、平 0.5）"""
+    delta = k * (score_a - expected_score(rating_a, rating_b))
+    return rating_a + delta, rating_b - delta
+
+
+def _previous_match(p1, p2):
+    """每场对局中，双方上一场对局的下标的较大者（都没有上一场时为 -1）"""
+    n = len(p1)
+    players = np.concatenate((p1, p2))
+    matches = np.concatenate((np.arange(n), np.arange(n)))
+    order = np.argsort(players * n + matches)   # 按选手、再按时间排序（键唯一）
+    sorted_players, sorted_matches = players[order], matches[order]
+    prev_sorted = np.full(2 * n, -1, dtype=np.int64)
+    same = sorted_players[1:] == sorted_players[:-1]
+    prev_sorted[1:][same] = sorted_matches[:-1][same]
+    prev = np.empty(2 * n, dtype=np.int64)
+    prev[order] = prev_sorted
+    return np.maximum(prev[:n], prev[n:])
+
+
+def split_rounds(p1, p2, window=4096, max_rounds=None):
+    """
+    把按时间排好的对局切成若干段连续的"轮"：段内每场对局双方的上一场都在段开始之前，
+    即段内选手互不重复。返回每段的结束下标；段数超过 max_rounds 时提前返回 None。
+    赛事数据里同一赛程的对局本来就互不相交，一轮通常就是一段。
+    """
+    prev = _previous_match(p1, p2)
+    n = len(prev)
+    ends = []
+    start = 0
+    # 每次只看上一段长度几倍的窗口：段很短时不必每段都扫描整个 window
+    span = min(window, 256)
+    while start < n:
+        chunk = prev[start:start + span]
+        clash = np.flatnonzero(chunk >= start)
+        length = int(clash[0]) if clash.size else len(chunk)
+        start += length
+        ends.append(start)
+        if max_rounds is not None and len(ends) > max_rounds:
+            return None
+        span = min(window, max(256, 4 * length))
+    return ends
+
+
+def compute(n_players, p1, p2, score1, k=DEFAULT_K, initial=DEFAULT_INITIAL, initial_ratings=None):
+    """
+    p1 / p2: 每场对局双方的选手下标（0..n_players-1），按时间顺序排列；score1: 选手 1 的得分。
+    返回每名选手的最终分数（list）。
+    平均每轮不足 MIN_ROUND_SIZE 场（随机配对、选手很少的历史）时按轮向量化反而更慢，改为逐场计算。
+    """
+    if np is None or n_players // 2 < MIN_ROUND_SIZE:
+        return _compute_python(n_players, p1, p2, score1, k, initial, initial_ratings)
+
+    ratings = np.full(n_players, initial, dtype=np.float64)
+    if initial_ratings is not None:
+        ratings[:] = initial_ratings
+    if not len(p1):
+        return ratings.tolist()
+
+    # 先只切开头一段估算每轮的大小，太碎时不必为整个历史排序和切分
+    probe = min(len(p1), ROUND_PROBE)
+    if split_rounds(np.asarray(p1[:probe], dtype=np.int64), np.asarray(p2[:probe], dtype=np.int64),
+                    max_rounds=max(1, probe // MIN_ROUND_SIZE)) is None:
+        return _compute_python(n_players, p1, p2, score1, k, initial, initial_ratings)
+    a_all = np.asarray(p1, dtype=np.int64)
+    b_all = np.asarray(p2, dtype=np.int64)
+    ends = split_rounds(a_all, b_all, max_rounds=len(a_all) // MIN_ROUND_SIZE)
+    if ends is None:
+        return _compute_python(n_players, p1, p2, score1, k, initial, initial_ratings)
+    score1 = np.asarray(score1, dtype=np.float64)
+    start = 0
+    for end in ends:
+        a, b = a_all[start:end], b_all[start:end]
+        ra, rb = ratings[a], ratings[b]
+        delta = k * (score1[start:end] - 1.0 / (1.0 + 10.0 ** ((rb - ra) / 400.0)))
+        # 同一轮内选手下标不重复，花式索引赋值是安全的
+        ratings[a] = ra + delta
+        ratings[b] = rb - delta
+        start = end
+    return ratings.tolist()
+
+
+def _compute_python(n_players, p1, p2, score1, k, initial, initial_ratings):
+    ratings = list(initial_ratings) if initial_ratings is not None else [initial] * n_players
+    for a, b, s in zip(p1, p2, score1):
+        ratings[a], ratings[b] = update_pair(ratings[a], ratings[b], s, k)
+    return ratings
@@ -0,0 +1,174 @@
+"""
+选手名搜索索引：常驻内存，支持子串、拼音全拼和拼音首字母（安装 pypinyin 时）。
+
+每个名字生成几个检索键（小写原名、全拼、首字母），键里的每个字符和相邻两个字符都登记到倒排表；
+查询时取查询串各个二元组的倒排集合求交（单个字符时直接取该字符的集合），再对少量候选做一次子串确认，
+耗时只和命中数有关，和名单大小无关。
+
+姓名写错时的"您是不是要找"（suggest）用删除邻域：原名和全拼各自删去任意一个字符后的变体都登记到表里，
+两个串只要共享一个变体，编辑距离就不超过 2；查询时只需查 len(查询串) 次表，再按真实距离过滤到 1 以内。
+全拼参与比较，所以同音字（张玮 / 张伟）的距离是 0，排在最前面。
+"""
+from functools import lru_cache
+
+try:
+    from pypinyin import Style, lazy_pinyin  # 可选依赖
+except ImportError:
+    lazy_pinyin = None
+
+
+@lru_cache(maxsize=65536)
+def search_keys(name):
+    """检索键：(小写原名, 全拼, 首字母)；未安装 pypinyin 或名字里没有汉字时只有原名"""
+    base = name.strip().lower()
+    keys = [base]
+    if lazy_pinyin is not None and any('\u4e00' <= ch <= '\u9fff' for ch in base):
+        syllables = lazy_pinyin(base, errors=lambda chars: list(chars))
+        full = ''.join(syllables).replace(' ', '')
+        initials = ''.join(s[0] for s in lazy_pinyin(base, style=Style.FIRST_LETTER, errors=lambda chars: list(chars)) if s)
+        keys.extend(k for k in (full, initials.replace(' ', '')) if k and k not in keys)
+    return tuple(keys)
+
+
+def _grams(key):
+    return set(key) | {key[i:i + 2] for i in range(len(key) - 1)}
+
+
+def _fuzzy_keys(name):
+    """参与纠错比较的键：原名和全拼（首字母太短，容易误配）"""
+    return search_keys(name)[:2]
+
+
+def _deletes(key):
+    """key 本身和删去一个字符后的所有变体；单个字符的键不做删除，避免空串匹配所有人"""
+    if len(key) < 2:
+        return {key}
+    return {key} | {key[:i] + key[i + 1:] for i in range(len(key))}
+
+
+def _distance(a, b):
+    """编辑距离，只区分 0、1 和"大于 1"（返回 2）；相邻两字符对调算一次。线性时间"""
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > 1:
+        return 2
+    i = 0
+    while i < min(len(a), len(b)) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        if a[i + 1:] == b[i + 1:]:
+            return 1    # 替换一个字符
+        swapped = i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]
+        return 1 if swapped else 2
+    longer, shorter = (a, b) if len(a) > len(b) else (b, a)
+    return 1 if longer[i + 1:] == shorter[i:] else 2    # 多 / 少一个字符
+
+
+class NameIndex:
+    """id -> 名字 的倒排索引；add / remove 均为 O(名字长度)"""
+
+    def __init__(self):
+        self.names = {}
+        self._postings = {}
+        self._variants = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, ident, name):
+        if self.names.get(ident) == name:
+            return
+        self.remove(ident)
+        self.names[ident] = name
+        for key in search_keys(name):
+            for gram in _grams(key):
+                self._postings.setdefault(gram, set()).add(ident)
+        for key in _fuzzy_keys(name):
+            for variant in _deletes(key):
+                self._variants.setdefault(variant, set()).add(ident)
+
+    def remove(self, ident):
+        name = self.names.pop(ident, None)
+        if name is None:
+            return
+        for key in search_keys(name):
+            for gram in _grams(key):
+                posting = self._postings.get(gram)
+                if posting is not None:
+                    posting.discard(ident)
+                    if not posting:
+                        del self._postings[gram]
+        for key in _fuzzy_keys(name):
+            for variant in _deletes(key):
+                posting = self._variants.get(variant)
+                if posting is not None:
+                    posting.discard(ident)
+                    if not posting:
+                        del self._variants[variant]
+
+    def sync(self, rows):
+        """与 [(id, 名字), ...] 对齐：只处理新增、改名和删除的选手"""
+        current = dict(rows)
+        for ident in [i for i in self.names if i not in current]:
+            self.remove(ident)
+        for ident, name in current.items():
+            self.add(ident, name)
+
+    def search(self, query, limit=20):
+        """
+        返回匹配的 id：原名完全相同、前缀匹配的排在前面，其次按名字长度；limit=None 时返回全部
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+        grams = [query] if len(query) == 1 else [query[i:i + 2] for i in range(len(query) - 1)]
+        postings = []
+        for gram in set(grams):
+            posting = self._postings.get(gram)
+            if not posting:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+
+        scored = []
+        for ident in candidates:
+            name = self.names[ident]
+            best = None
+            for key in search_keys(name):
+                pos = key.find(query)
+                if pos < 0:
+                    continue
+                rank = 0 if key == query else (1 if pos == 0 else 2)
+                if best is None or rank < best:
+                    best = rank
+            if best is not None:
+                scored.append((best, len(name), name, ident))
+        scored.sort()
+        hits = [ident for *_, ident in scored]
+        return hits if limit is None else hits[:limit]
+
+    def suggest(self, query, limit=5):
+        """与 query 编辑距离不超过 1 的名字 id（原名或全拼），按 (距离, 全拼距离, 长度差) 排序"""
+        keys = _fuzzy_keys(query.strip())
+        if not keys or len(keys[0]) < 2:
+            return []
+        candidates = set()
+        for key in keys:
+            for variant in _deletes(key):
+                candidates |= self._variants.get(variant, set())
+
+        scored = []
+        for ident in candidates:
+            name = self.names[ident]
+            name_keys = _fuzzy_keys(name)
+            # 原名对原名、全拼对全拼，以及直接输入拼音（查询原名）对全拼
+            pairs = list(zip(keys, name_keys)) + [(keys[0], k) for k in name_keys[1:]]
+            distances = [_distance(a, b) for a, b in pairs]
+            best = min(distances)
+            if best > 1:
+                continue
+            sound = distances[1] if len(keys) > 1 and len(name_keys) > 1 else best
+            scored.append((best, sound, abs(len(name) - len(query)), name, ident))
+        scored.sort()
+        return [ident for *_, ident in scored[:limit]]
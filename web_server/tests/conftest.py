@@ -0,0 +1,71 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as gamesign  # noqa: E402
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """
+    创建共用同一个 SQLite 文件库（已迁移到最新版本）的应用实例，相当于同一部署里的多个 worker；
+    config 覆盖默认的测试配置
+    """
+    created = []
+
+    def make(**config):
+        flask_app = gamesign.create_app({
+            'TESTING': True,
+            'SECRET_KEY': 'test-secret',
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "data.db"}',
+            'MIGRATION_LOCK_PATH': str(tmp_path / 'migrate.lock'),
+            'CHECKIN_APPLIER_LOCK_PATH': str(tmp_path / 'checkin_applier.lock'),
+            'SONG_FOLDER': str(tmp_path / 'songs'),
+            'AVATAR_FOLDER': str(tmp_path / 'avatars'),
+            'JOURNAL_DIR': '',
+            'CHECKIN_RUSH_MODE': False,
+            **config,
+        })
+        gamesign.init_app_resources(flask_app)
+        created.append(flask_app)
+        return flask_app
+
+    yield make
+    for flask_app in created:
+        with flask_app.app_context():
+            gamesign.db.engine.dispose()
+
+
+@pytest.fixture
+def app(make_app):
+    """默认的应用实例，测试在它的应用上下文里运行"""
+    flask_app = make_app()
+    with flask_app.app_context():
+        yield flask_app
+        gamesign.db.session.remove()
+
+
+@pytest.fixture
+def client(app, make_app):
+    """
+    另一个应用实例（同一个库）的测试客户端：请求在自己的应用上下文里执行，
+    没提交的写入不会被测试里的 session 看到
+    """
+    return make_app().test_client()
+
+
+@pytest.fixture
+def add_players():
+    """批量创建已签到的选手，返回选手 id 列表（序号从 1 开始）"""
+    def add(count, group='beginner'):
+        players = [
+            gamesign.Player(name=f'{group}-{i}', group=group, checked_in=True, match_number=i + 1)
+            for i in range(count)
+        ]
+        gamesign.db.session.add_all(players)
+        gamesign.db.session.commit()
+        return [p.id for p in players]
+    return add
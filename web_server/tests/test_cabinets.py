@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+import cabinets
+import app as gamesign
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def _cab(ident, group=None, player=None, next_=None, called_at=None, freed_at=None):
+    return {'id': ident, 'group': group, 'player': player, 'next': next_,
+            'called_at': called_at, 'freed_at': freed_at}
+
+
+def test_plan_calls_free_cabinets_first():
+    late, calls = cabinets.plan(
+        [_cab(1, player=100), _cab(2), _cab(3, group='peak')],
+        [(1, 'beginner'), (2, 'peak'), (3, 'beginner')],
+        T0, late_after=90,
+    )
+    assert late == []
+    # 空着的 2、3 号机先叫人（3 号是巅峰组专用机），正在使用的 1 号机最后叫
+    assert calls == {2: 1, 3: 2, 1: 3}
+
+
+def test_plan_skips_cabinets_that_already_called_someone():
+    late, calls = cabinets.plan(
+        [_cab(1, player=100, next_=5, called_at=T0)], [(1, 'beginner')], T0 + timedelta(hours=1), late_after=90,
+    )
+    # 机台还有人在打：叫到的人不算迟到
+    assert late == [] and calls == {}
+
+
+def test_plan_replaces_late_player():
+    cab = _cab(1, next_=5, called_at=T0 - timedelta(minutes=5), freed_at=T0)
+    late, calls = cabinets.plan([cab], [(6, 'beginner')], T0 + timedelta(seconds=60), late_after=90)
+    assert late == [] and calls == {}
+
+    late, calls = cabinets.plan([cab], [(6, 'beginner')], T0 + timedelta(seconds=91), late_after=90)
+    assert late == [5] and calls == {1: 6}
+
+
+def test_queue_key_pushes_late_players_back():
+    keys = sorted([
+        cabinets.queue_key(1, 1, 0, 1, penalty=5),
+        cabinets.queue_key(2, 0, 0, 2, penalty=5),
+        cabinets.queue_key(7, 0, 0, 3, penalty=5),
+    ])
+    assert [k[-1] for k in keys] == [2, 1, 3]
+
+
+def test_replan_calls_and_handles_late_players(app, add_players):
+    a, b, c = add_players(3)
+    gamesign.db.session.add(gamesign.Cabinet(id=1))
+    gamesign.get_system_state().match_started = True
+    gamesign.db.session.commit()
+
+    assert gamesign.replan_cabinets(now=T0) == {1: a}
+    gamesign.db.session.commit()
+
+    # 机台空着，叫到的人超过 CABINET_LATE_SECONDS 没上机：撤销叫号、迟到次数 +1、改叫下一位
+    late_at = T0 + timedelta(seconds=app.config['CABINET_LATE_SECONDS'] + 1)
+    assert gamesign.replan_cabinets(now=late_at) == {1: b}
+    gamesign.db.session.commit()
+    assert gamesign.db.session.get(gamesign.Player, a).queue_late == 1
+    assert gamesign.db.session.get(gamesign.Cabinet, 1).next_player_id == b
+
+    # 迟到者往后顺延 CABINET_LATE_PENALTY 位，排到了 c 后面
+    order = [r.id for r in gamesign.cabinet_queue()]
+    assert order.index(c) < order.index(a)
+
+
+def test_replan_does_nothing_before_match_starts(app, add_players):
+    add_players(2)
+    gamesign.db.session.add(gamesign.Cabinet(id=1))
+    gamesign.db.session.commit()
+    assert gamesign.replan_cabinets(now=T0) == {}
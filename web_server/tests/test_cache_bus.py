@@ -0,0 +1,57 @@
+import app as gamesign
+
+
+def _player_count(builds):
+    def build():
+        builds.append(1)
+        return gamesign.Player.query.count()
+    return build
+
+
+def _version(entity):
+    return gamesign.get_cache_versions().get(entity, 0)
+
+
+def test_write_in_one_worker_invalidates_another(make_app):
+    writer, reader = make_app(), make_app()
+    builds = []
+
+    with reader.app_context():
+        assert gamesign.local_cache.get('players', ('player',), _player_count(builds)) == 0
+    with reader.app_context():
+        assert gamesign.local_cache.get('players', ('player',), _player_count(builds)) == 0
+    assert len(builds) == 1
+
+    with writer.app_context():
+        before = _version('player')
+        gamesign.db.session.add(gamesign.Player(name='新选手'))
+        gamesign.db.session.commit()
+    with writer.app_context():
+        assert _version('player') == before + 1
+
+    # 另一个 worker 的本地缓存看到版本号变化后重建
+    with reader.app_context():
+        assert gamesign.local_cache.get('players', ('player',), _player_count(builds)) == 1
+    assert len(builds) == 2
+
+
+def test_rolled_back_write_does_not_bump(app):
+    before = _version('player')
+    gamesign.db.session.add(gamesign.Player(name='回滚'))
+    gamesign.db.session.flush()
+    gamesign.db.session.rollback()
+    with app.app_context():
+        assert _version('player') == before
+
+
+def test_uncommitted_write_bypasses_cache(app):
+    builds = []
+    assert gamesign.local_cache.get('players', ('player',), _player_count(builds)) == 0
+    gamesign.db.session.add(gamesign.Player(name='未提交'))
+    gamesign.db.session.flush()
+    # 本事务自己改过选手表：直接读到未提交的改动，结果不进缓存
+    assert gamesign.local_cache.get('players', ('player',), _player_count(builds)) == 1
+    gamesign.db.session.rollback()
+    with app.app_context():
+        assert gamesign.local_cache.get('players', ('player',), _player_count(builds)) == 0
+    assert len(builds) == 2
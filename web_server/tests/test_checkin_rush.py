@@ -0,0 +1,80 @@
+import pytest
+
+import app as gamesign
+
+
+@pytest.fixture
+def rush_app(make_app):
+    """
+    签到高峰模式；后台应用线程的间隔调到很长，流水在测试里手动应用。
+    不保持应用上下文：请求结束时没提交的写入会被丢弃，和线上一样
+    """
+    flask_app = make_app(CHECKIN_RUSH_MODE=True, CHECKIN_APPLY_INTERVAL=3600,
+                         PASSWORD_HASH_METHOD='pbkdf2:sha256:1')
+    with flask_app.app_context():
+        player = gamesign.Player(name='高峰选手', group='beginner')
+        player.set_password('secret')
+        gamesign.db.session.add(player)
+        gamesign.get_system_state().checkin_enabled = True
+        gamesign.db.session.commit()
+    return flask_app
+
+
+def _state(flask_app):
+    """(选手, 未处理的签到流水 id 列表)"""
+    with flask_app.app_context():
+        player = gamesign.Player.query.filter_by(name='高峰选手').one()
+        pending = gamesign.db.session.execute(
+            gamesign.db.select(gamesign.CheckinLog.id)
+            .where(gamesign.CheckinLog.player_id == player.id, gamesign.CheckinLog.applied_at.is_(None))
+        ).scalars().all()
+        return (player.id, player.checked_in, player.match_number), pending
+
+
+def test_login_queues_one_checkin(rush_app):
+    client = rush_app.test_client()
+    for _ in range(2):
+        resp = client.post('/api/auth/login', json={'name': '高峰选手', 'password': 'secret'})
+        assert resp.status_code == 200 and resp.get_json()['success']
+
+    (_, checked_in, _), pending = _state(rush_app)
+    assert not checked_in
+    assert len(pending) == 1
+
+    with rush_app.app_context():
+        gamesign.apply_checkin_batch()
+    (_, checked_in, match_number), pending = _state(rush_app)
+    assert checked_in and match_number == 1
+    assert pending == []
+
+
+def test_page_reload_shows_same_ticket(rush_app):
+    client = rush_app.test_client()
+    (player_id, _, _), _ = _state(rush_app)
+    client.set_cookie('player_id', str(player_id))
+    pages = [client.get('/').get_data(as_text=True) for _ in range(3)]
+
+    _, pending = _state(rush_app)
+    assert len(pending) == 1
+    assert all(f'排队号 {pending[0]}' in page for page in pages)
+
+
+def test_clear_all_drops_pending_checkins(rush_app):
+    client = rush_app.test_client()
+    client.post('/api/auth/login', json={'name': '高峰选手', 'password': 'secret'})
+    (old_id, _, _), pending = _state(rush_app)
+    assert len(pending) == 1
+
+    resp = client.post('/api/v1/admin/clear_all_secure', json={'password': '1145141919810ax'},
+                       headers={'X-Admin-Token': 'harbin_red_chart_2024'})
+    assert resp.status_code == 200
+
+    # 新导入的选手复用了旧 id：不能被上一场留下的流水签到
+    with rush_app.app_context():
+        gamesign.db.session.add(gamesign.Player(id=old_id, name='新选手', group='beginner'))
+        gamesign.db.session.commit()
+        assert gamesign.CheckinLog.query.count() == 0
+        assert gamesign.apply_checkin_batch() == 0
+        player = gamesign.db.session.get(gamesign.Player, old_id)
+        assert not player.checked_in
+        assert gamesign.pending_checkin_ticket(player) is None
@@ -0,0 +1,50 @@
+import app as gamesign
+
+
+def test_token_roundtrip(app):
+    token = gamesign.checkin_token(42)
+    assert token.startswith('42.')
+    assert gamesign.verify_checkin_token(token) == 42
+    assert gamesign.verify_checkin_token(f' {token}\n') == 42
+
+
+def test_tampered_token_is_rejected(app):
+    token = gamesign.checkin_token(42)
+    ident, sig = token.split('.')
+    flipped = sig[:-1] + ('A' if sig[-1] != 'A' else 'B')
+    assert gamesign.verify_checkin_token(f'{ident}.{flipped}') is None
+    # 签名换到别的选手上
+    assert gamesign.verify_checkin_token(f'43.{sig}') is None
+
+
+def test_wrong_length_and_malformed_tokens(app):
+    sig = gamesign.checkin_token(42).split('.')[1]
+    for token in (f'42.{sig[:-1]}', f'42.{sig}A', '42.', '42', f'x.{sig}', f'-1.{sig}', '', None):
+        assert gamesign.verify_checkin_token(token) is None
+
+
+def test_secret_change_invalidates_tokens(app):
+    token = gamesign.checkin_token(7)
+    app.config['CHECKIN_TOKEN_SECRET'] = 'rotated'
+    assert gamesign.verify_checkin_token(token) is None
+    assert gamesign.verify_checkin_token(gamesign.checkin_token(7)) == 7
+
+
+def test_token_from_scanned_link(app):
+    token = gamesign.checkin_token(5)
+    assert gamesign.checkin_token_from_scan(f'https://example.com/?t={token}') == token
+    assert gamesign.checkin_token_from_scan(f'/?t={token}') == token
+    assert gamesign.checkin_token_from_scan(f'  {token} ') == token
+
+
+def test_scanning_badge_checks_player_in(client, app):
+    player = gamesign.Player(name='扫码选手', group='beginner')
+    gamesign.db.session.add(player)
+    gamesign.get_system_state().checkin_enabled = True
+    gamesign.db.session.commit()
+
+    resp = client.get(f'/?t={gamesign.checkin_token(player.id)}')
+    assert resp.status_code == 302
+    gamesign.db.session.expire_all()
+    player = gamesign.db.session.get(gamesign.Player, player.id)
+    assert player.checked_in and player.match_number == 1
@@ -0,0 +1,73 @@
+import app as gamesign
+
+
+def _toggle(client, player_id, key, payload=None):
+    return client.post(
+        f'/api/v1/player/{player_id}/toggle_machine',
+        json=payload or {}, headers={gamesign.IDEMPOTENCY_HEADER: key},
+    )
+
+
+def _on_machine(player_id):
+    gamesign.db.session.expire_all()
+    return gamesign.db.session.get(gamesign.Player, player_id).on_machine
+
+
+def test_retry_replays_first_response(client, add_players):
+    (pid,) = add_players(1)
+    first = _toggle(client, pid, 'key-1')
+    assert first.status_code == 200 and _on_machine(pid)
+
+    retry = _toggle(client, pid, 'key-1')
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert retry.get_data() == first.get_data()
+    # 重发没有再翻转一次
+    assert _on_machine(pid)
+
+    # 新的键才是新的操作
+    assert _toggle(client, pid, 'key-2').status_code == 200
+    assert not _on_machine(pid)
+
+
+def test_same_key_with_different_body_conflicts(client, add_players):
+    (pid,) = add_players(1)
+    assert _toggle(client, pid, 'key-1', {'n': 1}).status_code == 200
+    resp = _toggle(client, pid, 'key-1', {'n': 2})
+    assert resp.status_code == 422
+    assert resp.get_json()['success'] is False
+    assert _on_machine(pid)
+
+
+def test_keys_are_scoped_per_player(client, add_players):
+    a, b = add_players(2)
+    assert _toggle(client, a, 'shared').status_code == 200
+    resp = _toggle(client, b, 'shared')
+    assert 'Idempotent-Replayed' not in resp.headers
+    assert _on_machine(a) and _on_machine(b)
+
+
+def test_form_conflict_redirects_to_player_page(client, add_players):
+    (pid,) = add_players(1)
+    client.set_cookie('player_id', str(pid))
+    field = gamesign.IDEMPOTENCY_FORM_FIELD
+    assert client.post('/toggle_machine', data={field: 'form-key'}).status_code == 302
+    resp = client.post('/toggle_machine', data={field: 'form-key', 'extra': '1'})
+    assert resp.status_code == 302
+    assert _on_machine(pid)
+
+
+def test_cache_evicts_oldest_and_expires():
+    cache = gamesign.IdempotencyCache(max_entries=2, ttl=60)
+    for key in ('a', 'b', 'c'):
+        assert cache.begin(key, b'fp') == ('new', None)
+        cache.finish(key, b'fp', (200, b'', [], []))
+    assert len(cache) == 2
+    assert cache.begin('a', b'fp') == ('new', None)
+    cache.finish('a', b'fp', None)
+    assert cache.begin('c', b'fp')[0] == 'hit'
+    assert cache.begin('c', b'other') == ('conflict', None)
+
+    expired = gamesign.IdempotencyCache(max_entries=2, ttl=-1)
+    expired.begin('a', b'fp')
+    expired.finish('a', b'fp', (200, b'', [], []))
+    assert expired.begin('a', b'fp') == ('new', None)
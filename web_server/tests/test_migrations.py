@@ -0,0 +1,75 @@
+import sqlalchemy as sa
+
+import migrations
+import app as gamesign
+
+
+def _columns(engine, table):
+    return {c['name'] for c in sa.inspect(engine).get_columns(table)}
+
+
+def _model_schema(metadata):
+    return {t.name: {c.name for c in t.columns} for t in metadata.sorted_tables}
+
+
+def test_fresh_database_matches_models(tmp_path):
+    engine = sa.create_engine(f'sqlite:///{tmp_path / "fresh.db"}')
+    applied = migrations.upgrade(engine, gamesign.db.metadata)
+    assert [v for v, _ in applied] == [v for v, _, _ in migrations.MIGRATIONS]
+
+    for table, columns in _model_schema(gamesign.db.metadata).items():
+        assert _columns(engine, table) == columns, table
+    # 已是最新版本：不再执行任何迁移
+    assert migrations.upgrade(engine, gamesign.db.metadata) == []
+
+
+def test_upgrade_from_baseline_keeps_data(tmp_path):
+    engine = sa.create_engine(f'sqlite:///{tmp_path / "v1.db"}')
+    with engine.begin() as conn:
+        migrations._version_metadata.create_all(conn)
+        migrations._baseline(conn, gamesign.db.metadata)
+        migrations._write_version(conn, 1)
+        conn.execute(sa.text(
+            "INSERT INTO player (name, checked_in, match_number, \"group\") VALUES ('老选手', 1, 3, 'advanced')"
+        ))
+        conn.execute(sa.text(
+            "INSERT INTO song (name, phase, \"group\", active) VALUES ('老曲目', 'top16', 'peak', 1)"
+        ))
+    assert 'elo' not in _columns(engine, 'player')
+    assert 'weight' not in _columns(engine, 'song')
+    assert [v for v, _ in migrations.pending(engine)] == [2, 3, 4, 5, 6]
+
+    applied = migrations.upgrade(engine, gamesign.db.metadata)
+    assert [v for v, _ in applied] == [2, 3, 4, 5, 6]
+    for table, columns in _model_schema(gamesign.db.metadata).items():
+        assert _columns(engine, table) == columns, table
+
+    with engine.connect() as conn:
+        assert migrations.read_version(conn) == migrations.LATEST_VERSION
+        player = conn.execute(sa.text('SELECT * FROM player')).mappings().one()
+        song = conn.execute(sa.text('SELECT * FROM song')).mappings().one()
+    assert (player['name'], player['match_number'], player['group']) == ('老选手', 3, 'advanced')
+    assert player['elo'] == gamesign.ratings.DEFAULT_INITIAL
+    assert player['queue_late'] == 0
+    assert song['weight'] == 1.0
+
+
+def test_upgrade_legacy_database_without_version_table(tmp_path):
+    engine = sa.create_engine(f'sqlite:///{tmp_path / "legacy.db"}')
+    with engine.begin() as conn:
+        conn.execute(sa.text(
+            'CREATE TABLE player (id INTEGER PRIMARY KEY, name VARCHAR(80) UNIQUE NOT NULL, '
+            'checked_in BOOLEAN, match_number INTEGER, "group" VARCHAR(20))'
+        ))
+        conn.execute(sa.text("INSERT INTO player (name, checked_in) VALUES ('旧库选手', 0)"))
+        conn.execute(sa.text(
+            'CREATE TABLE system_state (id INTEGER PRIMARY KEY, match_generated BOOLEAN, match_started BOOLEAN)'
+        ))
+        conn.execute(sa.text('INSERT INTO system_state (id, match_generated, match_started) VALUES (1, 0, NULL)'))
+
+    migrations.upgrade(engine, gamesign.db.metadata)
+    with engine.connect() as conn:
+        player = conn.execute(sa.text('SELECT * FROM player')).mappings().one()
+        state = conn.execute(sa.text('SELECT * FROM system_state')).mappings().one()
+    assert player['forfeited'] == 0 and player['promotion_status'] == 'none'
+    assert state['match_started'] == 0 and state['checkin_enabled'] == 0
@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+import ratings
+
+
+def _history(shape, players, matches, seed=7):
+    rng = random.Random(seed)
+    p1, p2 = [], []
+    if shape == 'tournament':
+        roster = list(range(players))
+        while len(p1) < matches:
+            rng.shuffle(roster)
+            p1.extend(roster[0:len(roster) - 1:2])
+            p2.extend(roster[1::2])
+        del p1[matches:], p2[matches:]
+    else:
+        for _ in range(matches):
+            a, b = rng.sample(range(players), 2)
+            p1.append(a)
+            p2.append(b)
+    return p1, p2, [float(rng.random() < 0.5) for _ in p1]
+
+
+@pytest.mark.parametrize('shape,players', [('tournament', 1000), ('random', 1000), ('random', 20)])
+def test_compute_matches_scalar_loop(shape, players):
+    p1, p2, score1 = _history(shape, players, 20000)
+    expected = ratings._compute_python(players, p1, p2, score1, ratings.DEFAULT_K, ratings.DEFAULT_INITIAL, None)
+    got = ratings.compute(players, p1, p2, score1)
+    assert max(abs(x - y) for x, y in zip(expected, got)) < 1e-9
+
+
+def test_fragmented_history_uses_scalar_loop(monkeypatch):
+    if ratings.np is None:
+        pytest.skip('numpy 未安装')
+    p1, p2, score1 = _history('random', 1000, 20000)
+    calls = []
+    scalar = ratings._compute_python
+    monkeypatch.setattr(ratings, '_compute_python', lambda *args: calls.append(1) or scalar(*args))
+    ratings.compute(1000, p1, p2, score1)
+    assert calls == [1]
+
+    calls.clear()
+    p1, p2, score1 = _history('tournament', 1000, 20000)
+    ratings.compute(1000, p1, p2, score1)
+    assert calls == []
+
+
+def test_split_rounds_stops_past_max_rounds():
+    if ratings.np is None:
+        pytest.skip('numpy 未安装')
+    np = ratings.np
+    p1, p2, _ = _history('random', 20, 1000)
+    ends = ratings.split_rounds(np.asarray(p1), np.asarray(p2))
+    assert ends[-1] == 1000
+    assert ratings.split_rounds(np.asarray(p1), np.asarray(p2), max_rounds=len(ends) - 1) is None
@@ -0,0 +1,28 @@
+import threading
+import time
+
+import app as gamesign
+
+
+def test_concurrent_generate_does_not_reshuffle(app, client, add_players):
+    ids = add_players(8)
+    with client.session_transaction() as sess:
+        sess['admin_logged_in'] = True
+
+    # 先拿到状态行的锁并生成序号，提交前另一个管理员也点了“生成”
+    state = gamesign.get_system_state(for_update=True)
+    responses = []
+    other = threading.Thread(target=lambda: responses.append(client.post('/admin', data={'action': 'generate'})))
+    other.start()
+    time.sleep(0.3)
+    expected = {}
+    for number, pid in enumerate(reversed(ids), start=1):
+        gamesign.db.session.get(gamesign.Player, pid).match_number = number
+        expected[pid] = number
+    state.match_generated = True
+    gamesign.db.session.commit()
+    other.join(10)
+
+    assert responses and responses[0].status_code == 302
+    gamesign.db.session.expire_all()
+    assert {pid: gamesign.db.session.get(gamesign.Player, pid).match_number for pid in ids} == expected
@@ -0,0 +1,72 @@
+import pytest
+
+import draw
+import app as gamesign
+
+
+def _add_songs(count, phase='top16', group='peak'):
+    songs = [
+        gamesign.Song(name=f'曲目 {i}', phase=phase, group=group, weight=1.0 + i % 3, difficulty=12 + i % 3)
+        for i in range(count)
+    ]
+    gamesign.db.session.add_all(songs)
+    gamesign.db.session.commit()
+    return [s.id for s in songs]
+
+
+def test_draw_is_deterministic_for_a_seed():
+    table = draw.AliasTable([1, 2, 3, 4, 5], [1.0, 2.0, 3.0, 4.0, 5.0])
+    first = draw.draw(table, 3, excluded={2}, seed=123)
+    assert first == draw.draw(table, 3, excluded={2}, seed=123)
+    assert len(set(first)) == 3 and 2 not in first
+
+
+def test_replay_matches_logged_draws(app):
+    _add_songs(12)
+    drawn = []
+    for _ in range(4):
+        songs = gamesign.draw_songs('top16', 'peak', k=3)
+        gamesign.db.session.commit()
+        drawn.append([s.id for s in songs])
+
+    logs = gamesign.SongDrawLog.query.order_by(gamesign.SongDrawLog.id).all()
+    assert [log.get_song_ids() for log in logs] == drawn
+    for log in logs:
+        assert gamesign.replay_song_draw(log) == log.get_song_ids()
+
+
+def test_no_repeats_until_pool_is_exhausted(app):
+    ids = _add_songs(9)
+    seen = []
+    for _ in range(3):
+        seen += [s.id for s in gamesign.draw_songs('top16', 'peak', k=3)]
+        gamesign.db.session.commit()
+    assert sorted(seen) == ids
+
+    # 剩下的不够一次抽选：整个曲库重新开放，记录里的排除集合为空
+    assert len(gamesign.draw_songs('top16', 'peak', k=3)) == 3
+    gamesign.db.session.commit()
+    log = gamesign.SongDrawLog.query.order_by(gamesign.SongDrawLog.id.desc()).first()
+    assert log.excluded == '[]'
+    assert gamesign.replay_song_draw(log) == log.get_song_ids()
+
+
+@pytest.mark.parametrize('bad', [float('inf'), float('nan'), 0.0, -1.0])
+def test_alias_table_rejects_bad_weights(bad):
+    with pytest.raises(ValueError):
+        draw.AliasTable([1, 2, 3], [1.0, bad, 1.0])
+
+
+def test_difficulty_weights_skip_non_finite_values():
+    rows = [(1, 1.0, 12.0), (2, float('inf'), 13.0), (3, 1.0, float('nan')), (4, float('nan'), 14.0)]
+    weights = dict(draw.difficulty_weights(rows, bias=0.5))
+    assert set(weights) == {1, 3}
+    # nan 定数视为平均定数，不影响其余曲目
+    assert weights[3] == 1.0
+    assert all(0 < w < float('inf') for w in weights.values())
+
+
+def test_parse_float_rejects_non_finite():
+    assert gamesign._parse_float(' 12.7 ') == 12.7
+    for text in ('inf', '-inf', 'nan', 'Infinity', 'x', None):
+        assert gamesign._parse_float(text) is None
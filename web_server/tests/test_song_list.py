@@ -0,0 +1,21 @@
+import app as gamesign
+
+
+def test_unknown_query_values_are_not_cached(make_app):
+    worker = make_app()
+    client = worker.test_client()
+    with worker.app_context():
+        gamesign.db.session.add(gamesign.Song(name='曲目', phase='qualifier', group='beginner'))
+        gamesign.db.session.commit()
+
+    resp = client.get('/api/v1/songs?phase=qualifier&group=beginner')
+    assert [s['name'] for s in resp.get_json()['data']] == ['曲目']
+    assert client.get('/api/v1/songs').status_code == 200
+    with worker.app_context():
+        cached = len(gamesign.local_cache)
+
+    for i in range(50):
+        resp = client.get(f'/api/v1/songs?phase=p{i}&group=g{i}')
+        assert resp.get_json()['data'] == []
+    with worker.app_context():
+        assert len(gamesign.local_cache) == cached